@@ -7,7 +7,7 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 from datetime import timedelta
 from decimal import Decimal
 
-from django.db.models import Avg, Count, Sum
+from django.db.models import Avg, Count, Q, Sum
 from django.db.models.functions import TruncDate, TruncMonth
 from django.utils import timezone
 
@@ -37,61 +37,61 @@ class DashboardStatsView(APIView):
         start_of_month = today.replace(day=1)
         start_of_week = today - timedelta(days=today.weekday())
 
+        # One conditional aggregate per table instead of a COUNT/SUM query per figure
         # Patient statistics
-        total_patients = Patient.objects.filter(is_active=True).count()
-        new_patients_month = Patient.objects.filter(created_at__date__gte=start_of_month).count()
-        new_patients_week = Patient.objects.filter(created_at__date__gte=start_of_week).count()
+        patient_stats = Patient.objects.aggregate(
+            total=Count("id", filter=Q(is_active=True)),
+            new_this_month=Count("id", filter=Q(created_at__date__gte=start_of_month)),
+            new_this_week=Count("id", filter=Q(created_at__date__gte=start_of_week)),
+        )
 
         # Lab order statistics
-        total_lab_orders = LabOrder.objects.count()
-        pending_lab_orders = LabOrder.objects.filter(status="PENDING").count()
-        completed_lab_orders_today = LabOrder.objects.filter(
-            status__in=["RESULTED", "REVIEWED"],
-            updated_at__date=today,
-        ).count()
+        lab_stats = LabOrder.objects.aggregate(
+            total=Count("id"),
+            pending=Count("id", filter=Q(status="PENDING")),
+            completed_today=Count("id", filter=Q(status__in=["RESULTED", "REVIEWED"], updated_at__date=today)),
+        )
 
         # Revenue statistics
-        revenue_month = Payment.objects.filter(
+        revenue_stats = Payment.objects.filter(
             status=PaymentStatus.COMPLETED,
             created_at__date__gte=start_of_month,
-        ).aggregate(total=Sum("amount"))["total"] or Decimal("0.00")
-
-        revenue_today = Payment.objects.filter(
-            status=PaymentStatus.COMPLETED,
-            created_at__date=today,
         ).aggregate(
-            total=Sum("amount")
-        )["total"] or Decimal("0.00")
+            this_month=Sum("amount"),
+            today=Sum("amount", filter=Q(created_at__date=today)),
+        )
+        revenue_month = revenue_stats["this_month"] or Decimal("0.00")
+        revenue_today = revenue_stats["today"] or Decimal("0.00")
 
         # Invoice statistics
-        pending_invoices = Invoice.objects.filter(
-            status__in=[InvoiceStatus.PENDING, InvoiceStatus.PARTIALLY_PAID]
-        ).count()
-        overdue_invoices = Invoice.objects.filter(
-            status__in=[InvoiceStatus.PENDING, InvoiceStatus.PARTIALLY_PAID],
-            due_date__lt=today,
-        ).count()
-        total_outstanding = Invoice.objects.filter(
+        invoice_stats = Invoice.objects.filter(
             status__in=[InvoiceStatus.PENDING, InvoiceStatus.PARTIALLY_PAID]
-        ).aggregate(total=Sum("balance_due"))["total"] or Decimal("0.00")
+        ).aggregate(
+            pending=Count("id"),
+            overdue=Count("id", filter=Q(due_date__lt=today)),
+            outstanding=Sum("balance_due"),
+        )
+        total_outstanding = invoice_stats["outstanding"] or Decimal("0.00")
 
         # Staff statistics
-        total_staff = User.objects.filter(is_active=True).exclude(role=UserRole.ADMIN).count()
-        doctors = User.objects.filter(is_active=True, role=UserRole.DOCTOR).count()
-        nurses = User.objects.filter(is_active=True, role=UserRole.NURSE).count()
-        lab_techs = User.objects.filter(is_active=True, role=UserRole.LAB_TECH).count()
+        staff_stats = User.objects.filter(is_active=True).aggregate(
+            total=Count("id", filter=~Q(role=UserRole.ADMIN)),
+            doctors=Count("id", filter=Q(role=UserRole.DOCTOR)),
+            nurses=Count("id", filter=Q(role=UserRole.NURSE)),
+            lab_techs=Count("id", filter=Q(role=UserRole.LAB_TECH)),
+        )
 
         return Response(
             {
                 "patients": {
-                    "total": total_patients,
-                    "new_this_month": new_patients_month,
-                    "new_this_week": new_patients_week,
+                    "total": patient_stats["total"],
+                    "new_this_month": patient_stats["new_this_month"],
+                    "new_this_week": patient_stats["new_this_week"],
                 },
                 "lab_orders": {
-                    "total": total_lab_orders,
-                    "pending": pending_lab_orders,
-                    "completed_today": completed_lab_orders_today,
+                    "total": lab_stats["total"],
+                    "pending": lab_stats["pending"],
+                    "completed_today": lab_stats["completed_today"],
                 },
                 "revenue": {
                     "today": str(revenue_today),
@@ -99,15 +99,15 @@ class DashboardStatsView(APIView):
                     "currency": "KES",
                 },
                 "invoices": {
-                    "pending": pending_invoices,
-                    "overdue": overdue_invoices,
+                    "pending": invoice_stats["pending"],
+                    "overdue": invoice_stats["overdue"],
                     "total_outstanding": str(total_outstanding),
                 },
                 "staff": {
-                    "total": total_staff,
-                    "doctors": doctors,
-                    "nurses": nurses,
-                    "lab_technicians": lab_techs,
+                    "total": staff_stats["total"],
+                    "doctors": staff_stats["doctors"],
+                    "nurses": staff_stats["nurses"],
+                    "lab_technicians": staff_stats["lab_techs"],
                 },
                 "generated_at": timezone.now().isoformat(),
             }
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-15 22:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("billing", "0002_alter_invoice_issue_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["invoice", "-created_at"], name="billing_pay_invoice_fb9795_idx"),
+        ),
+    ]
@@ -10,6 +10,7 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Sum
 from django.utils import timezone
 
 
@@ -205,7 +206,8 @@ class Invoice(models.Model):
 
     def _calculate_totals(self):
         """Calculate invoice totals from line items."""
-        self.subtotal = sum(item.total_price for item in self.items.all())
+        # Summed in the database rather than loading every line item
+        self.subtotal = self.items.aggregate(subtotal=Sum("total_price"))["subtotal"] or Decimal("0.00")
         self.total_amount = self.subtotal + self.tax_amount - self.discount_amount
         self.balance_due = self.total_amount - self.amount_paid
 
@@ -345,6 +347,8 @@ class Payment(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["payment_method"]),
             models.Index(fields=["created_at"]),
+            # InvoiceViewSet.payments: filter(invoice=...).order_by("-created_at")
+            models.Index(fields=["invoice", "-created_at"]),
         ]
 
     def __str__(self):
@@ -8,6 +8,7 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 
 import base64
 import logging
+import re
 from datetime import datetime
 from typing import Any
 
@@ -17,6 +18,8 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+_NON_DIGITS_RE = re.compile(r"\D")
+
 
 class MpesaConfig:
     """M-Pesa configuration from settings."""
@@ -233,18 +236,15 @@ class MpesaService:
         Returns:
             Formatted phone number
         """
-        # Remove any non-digit characters
-        phone = "".join(filter(str.isdigit, phone))
+        # Remove any non-digit characters (a leading "+" goes with them)
+        digits = _NON_DIGITS_RE.sub("", phone)
 
         # Handle different formats
-        if phone.startswith("0"):
-            phone = "254" + phone[1:]
-        elif phone.startswith("+254"):
-            phone = phone[1:]
-        elif not phone.startswith("254"):
-            phone = "254" + phone
-
-        return phone
+        if digits.startswith("0"):
+            return "254" + digits[1:]
+        if digits.startswith("254"):
+            return digits
+        return "254" + digits
 
     @staticmethod
     def parse_callback(callback_data: dict) -> dict[str, Any]:
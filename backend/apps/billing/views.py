@@ -6,7 +6,7 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 
 import logging
 
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.utils import timezone
 
 from rest_framework import status, viewsets
@@ -17,7 +17,7 @@ from rest_framework.views import APIView
 
 from apps.users.models import UserRole
 
-from .models import Invoice, InvoiceStatus, Payment, PaymentMethod, PaymentStatus, Service
+from .models import Invoice, InvoiceItem, InvoiceStatus, Payment, PaymentMethod, PaymentStatus, Service
 from .mpesa import MpesaError, MpesaService
 from .serializers import (
     InvoiceCreateSerializer,
@@ -61,7 +61,9 @@ class ServiceViewSet(viewsets.ModelViewSet):
 class InvoiceViewSet(viewsets.ModelViewSet):
     """ViewSet for invoices."""
 
-    queryset = Invoice.objects.select_related("patient", "created_by").prefetch_related("items")
+    queryset = Invoice.objects.select_related("patient", "created_by").prefetch_related(
+        Prefetch("items", queryset=InvoiceItem.objects.select_related("service"))
+    )
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ["status", "patient"]
@@ -86,6 +88,10 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         """Filter invoices based on user role and query params."""
         queryset = super().get_queryset()
 
+        # The payments action only needs the invoice row, not its line items
+        if self.action == "payments":
+            queryset = queryset.prefetch_related(None)
+
         # Filter by status
         status_param = self.request.query_params.get("status")
         if status_param:
@@ -125,7 +131,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     def payments(self, request, pk=None):
         """Get payments for an invoice."""
         invoice = self.get_object()
-        payments = Payment.objects.filter(invoice=invoice).order_by("-created_at")
+        payments = Payment.objects.filter(invoice=invoice).select_related("invoice").order_by("-created_at")
         return Response(PaymentSerializer(payments, many=True).data)
 
 
@@ -1,9 +1,17 @@
 """Core app configuration."""
 
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     verbose_name = "Core"
+
+    def ready(self):
+        """Validate settings that must be present before serving patient data."""
+        hospital_settings = getattr(settings, "HOSPITAL_SETTINGS", {})
+        if hospital_settings.get("REQUIRE_PII_ENCRYPTION_KEY") and not hospital_settings.get("PII_ENCRYPTION_KEY"):
+            raise ImproperlyConfigured("PII_ENCRYPTION_KEY must be set in production for encrypting patient data")
@@ -17,28 +17,37 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--max-retries", type=int, default=30, help="Maximum number of connection attempts")
-        parser.add_argument("--retry-delay", type=int, default=2, help="Seconds to wait between retries")
+        parser.add_argument(
+            "--retry-delay",
+            type=float,
+            default=2.0,
+            help="Maximum seconds to wait between retries (backoff starts at 0.1s and doubles)",
+        )
 
     def handle(self, *args, **options):
         max_retries = options["max_retries"]
-        retry_delay = options["retry_delay"]
+        max_delay = options["retry_delay"]
+        delay = min(0.1, max_delay)
 
         self.stdout.write("🔄 Waiting for database...")
 
+        db_conn = connections["default"]
         for i in range(max_retries):
             try:
-                db_conn = connections["default"]
-                db_conn.ensure_connection()
+                # Round-trip a query rather than trusting connection state
+                with db_conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
                 self.stdout.write(self.style.SUCCESS("✅ Database is ready!"))
                 return
             except OperationalError:
                 if i < max_retries - 1:
                     self.stdout.write(
                         self.style.WARNING(
-                            f"⏳ Database unavailable, waiting {retry_delay}s... " f"(attempt {i+1}/{max_retries})"
+                            f"⏳ Database unavailable, waiting {delay:.1f}s... " f"(attempt {i+1}/{max_retries})"
                         )
                     )
-                    time.sleep(retry_delay)
+                    time.sleep(delay)
+                    delay = min(delay * 2, max_delay)
                 else:
                     self.stdout.write(self.style.ERROR(f"❌ Database not available after {max_retries} attempts"))
                     raise
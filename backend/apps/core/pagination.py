@@ -0,0 +1,14 @@
+"""
+Pagination classes for DRF.
+
+Copyright (c) 2025, Immanuel Njogu. All rights reserved.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class StandardCursorPagination(CursorPagination):
+    """Cursor pagination whose page size clients can set with ``?page_size=``."""
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -5,6 +5,7 @@ Provides Python wrappers around C extensions with fallback to pure Python
 when C modules are not available or disabled.
 """
 
+import functools
 import hashlib
 import logging
 import secrets
@@ -21,6 +22,9 @@ try:
     if settings.HOSPITAL_SETTINGS.get("ENABLE_C_MODULES", False):
         import hospital_native  # type: ignore[import-not-found,no-redef]
 
+        # The package imports its extensions lazily; load them now so a missing build falls back here
+        from hospital_native import _cutils, _hl7val  # type: ignore[import-not-found]  # noqa: F401
+
         C_MODULES_AVAILABLE = True
         logger.info("✓ C modules loaded successfully")
 except ImportError as e:
@@ -69,6 +73,20 @@ def sha256_hash(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+@functools.lru_cache(maxsize=4)
+def _aesgcm(key: bytes):
+    """Return a cached AESGCM cipher for key (in practice only the PII key is used)."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    return AESGCM(key)
+
+
+@functools.lru_cache(maxsize=4)
+def _native_cipher(key: bytes):
+    """Return a cached native AesGcmCipher, so the key schedule is expanded once per key."""
+    return hospital_native.AesGcmCipher(key)
+
+
 def aes_gcm_encrypt(plaintext: bytes, key: bytes) -> bytes:
     """
     Encrypt data using AES-256-GCM.
@@ -82,17 +100,14 @@ def aes_gcm_encrypt(plaintext: bytes, key: bytes) -> bytes:
     """
     if C_MODULES_AVAILABLE:
         try:
-            return hospital_native.aes_gcm_encrypt(plaintext, key)
+            return _native_cipher(key).encrypt(plaintext)
         except Exception as e:
             logger.error(f"C encryption failed: {e}")
             raise
 
     # Python fallback using cryptography library
-    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-
-    aesgcm = AESGCM(key)
     nonce = secrets.token_bytes(12)
-    ciphertext = aesgcm.encrypt(nonce, plaintext, None)
+    ciphertext = _aesgcm(key).encrypt(nonce, plaintext, None)
     return nonce + ciphertext
 
 
@@ -109,18 +124,15 @@ def aes_gcm_decrypt(ciphertext: bytes, key: bytes) -> bytes:
     """
     if C_MODULES_AVAILABLE:
         try:
-            return hospital_native.aes_gcm_decrypt(ciphertext, key)
+            return _native_cipher(key).decrypt(ciphertext)
         except Exception as e:
             logger.error(f"C decryption failed: {e}")
             raise
 
     # Python fallback using cryptography library
-    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-
-    aesgcm = AESGCM(key)
     nonce = ciphertext[:12]
     ct = ciphertext[12:]
-    return aesgcm.decrypt(nonce, ct, None)
+    return _aesgcm(key).decrypt(nonce, ct, None)
 
 
 # HL7 validation
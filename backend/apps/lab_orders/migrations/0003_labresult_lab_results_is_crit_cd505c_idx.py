@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-15 22:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lab_orders", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="labresult",
+            index=models.Index(fields=["is_critical", "reviewed_by"], name="lab_results_is_crit_cd505c_idx"),
+        ),
+    ]
@@ -16,6 +16,9 @@ from django.db import models
 
 from apps.core.utils import validate_hl7_segment
 
+# Highest OBX field index parse_obx_values reads (OBX-8, abnormal flags)
+_OBX_LAST_FIELD = 8
+
 
 class OrderStatus(models.TextChoices):
     """Lab order status workflow states."""
@@ -257,6 +260,10 @@ class LabResult(models.Model):
         verbose_name = "Lab Result"
         verbose_name_plural = "Lab Results"
         ordering = ["-resulted_at"]
+        indexes = [
+            # LabResultViewSet.critical: filter(is_critical=True, reviewed_by__isnull=True)
+            models.Index(fields=["is_critical", "reviewed_by"]),
+        ]
 
     def __str__(self):
         return f"Result for {self.order.order_number}"
@@ -310,18 +317,27 @@ class LabResult(models.Model):
         - reference_range: Normal range
         - abnormal_flag: H (high), L (low), A (abnormal), etc.
         """
+        if not self.hl7_obx_segments:
+            return []
+
         results = []
-        for segment in self.get_obx_list():
-            fields = segment.split("|")
-            if len(fields) >= 6:
-                result = {
-                    "set_id": fields[1] if len(fields) > 1 else "",
-                    "value_type": fields[2] if len(fields) > 2 else "",
-                    "identifier": fields[3] if len(fields) > 3 else "",
-                    "value": fields[5] if len(fields) > 5 else "",
-                    "units": fields[6] if len(fields) > 6 else "",
-                    "reference_range": fields[7] if len(fields) > 7 else "",
-                    "abnormal_flag": fields[8] if len(fields) > 8 else "",
+        for line in self.hl7_obx_segments.split("\n"):
+            # Only OBX-0..OBX-8 are read, so don't split the (up to 25) trailing fields
+            fields = line.strip().split("|", _OBX_LAST_FIELD + 1)
+            count = len(fields)
+            if count < 6:
+                continue
+            if count <= _OBX_LAST_FIELD:
+                fields += [""] * (_OBX_LAST_FIELD + 1 - count)
+            results.append(
+                {
+                    "set_id": fields[1],
+                    "value_type": fields[2],
+                    "identifier": fields[3],
+                    "value": fields[5],
+                    "units": fields[6],
+                    "reference_range": fields[7],
+                    "abnormal_flag": fields[8],
                 }
-                results.append(result)
+            )
         return results
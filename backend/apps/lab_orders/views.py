@@ -100,8 +100,9 @@ class LabOrderViewSet(viewsets.ModelViewSet):
     - All clinical staff can view orders
     """
 
+    # "result" is the reverse one-to-one read by has_result/get_result on every row
     queryset = LabOrder.objects.select_related(
-        "patient", "test_type", "ordering_provider", "specimen_collected_by"
+        "patient", "test_type", "ordering_provider", "specimen_collected_by", "result"
     ).all()
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["status", "priority", "patient", "ordering_provider", "test_type"]
@@ -0,0 +1,33 @@
+# Trigram index for the patient list ?search= filter (PostgreSQL only)
+
+from django.db import migrations
+
+# PatientViewSet.search_fields; SearchFilter ORs one icontains per field
+SEARCH_COLUMNS = ["mrn", "first_name", "last_name", "email", "phone"]
+INDEX_NAME = "patients_search_trgm_idx"
+
+
+def create_search_index(apps, schema_editor):
+    """Index UPPER(col::text), the expression Django's icontains compares on PostgreSQL."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    expressions = ", ".join(f'UPPER("{column}"::text) gin_trgm_ops' for column in SEARCH_COLUMNS)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON "patients" USING gin ({expressions})')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:09
+
+from django.db import migrations, models
+
+import apps.patients.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0002_patient_search_trgm_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="patient",
+            name="phone",
+            field=models.CharField(
+                blank=True, help_text="Phone number", max_length=20, validators=[apps.patients.models.validate_phone]
+            ),
+        ),
+    ]
@@ -7,12 +7,14 @@ fields like SSN.
 Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 """
 
+import functools
 import hashlib
+import re
 import uuid
 from datetime import date
 
 from django.conf import settings
-from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from apps.core.utils import aes_gcm_decrypt, aes_gcm_encrypt
@@ -41,6 +43,24 @@ class BloodType(models.TextChoices):
     UNKNOWN = "UNK", "Unknown"
 
 
+# Optional "+", optional leading "1", then 9-15 digits
+_PHONE_RE = re.compile(r"\+?1?\d{9,15}")
+
+
+def validate_phone(value: str):
+    """Validate a patient phone number against the precompiled pattern."""
+    if not _PHONE_RE.fullmatch(value):
+        raise ValidationError("Phone number must be 9-15 digits", code="invalid")
+
+
+@functools.lru_cache(maxsize=4)
+def _derive_encryption_key(key: str | bytes) -> bytes:
+    """Hash the configured PII key to exactly 32 bytes for AES-256 (cached per key)."""
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return hashlib.sha256(key).digest()
+
+
 def generate_mrn():
     """
     Generate a unique Medical Record Number.
@@ -91,7 +111,7 @@ class Patient(models.Model):
     phone = models.CharField(
         max_length=20,
         blank=True,
-        validators=[RegexValidator(regex=r"^\+?1?\d{9,15}$", message="Phone number must be 9-15 digits")],
+        validators=[validate_phone],
         help_text="Phone number",
     )
     email = models.EmailField(blank=True, help_text="Email address")
@@ -158,12 +178,7 @@ class Patient(models.Model):
         if not key:
             raise ValueError("PII_ENCRYPTION_KEY not configured")
 
-        # Ensure key is 32 bytes for AES-256
-        if isinstance(key, str):
-            key = key.encode("utf-8")
-
-        # Hash the key to ensure exactly 32 bytes
-        return hashlib.sha256(key).digest()
+        return _derive_encryption_key(key)
 
     def set_ssn(self, ssn: str):
         """
@@ -172,6 +187,9 @@ class Patient(models.Model):
         Args:
             ssn: Plain text SSN (e.g., "123-45-6789")
         """
+        # Drop the cached mask so it is recomputed from the new value
+        self.__dict__.pop("ssn_masked", None)
+
         if not ssn:
             self._ssn_encrypted = None
             self.ssn_hash = None
@@ -201,9 +219,14 @@ class Patient(models.Model):
         decrypted = aes_gcm_decrypt(bytes(self._ssn_encrypted), key)
         return decrypted.decode()
 
-    @property
+    def refresh_from_db(self, *args, **kwargs):
+        """Reload from the database, dropping the cached mask of the old SSN."""
+        self.__dict__.pop("ssn_masked", None)
+        super().refresh_from_db(*args, **kwargs)
+
+    @functools.cached_property
     def ssn_masked(self) -> str | None:
-        """Return masked SSN (XXX-XX-1234)."""
+        """Return masked SSN (XXX-XX-1234), decrypting once per instance."""
         ssn = self.get_ssn()
         if not ssn:
             return None
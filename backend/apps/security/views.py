@@ -41,7 +41,7 @@ class IsAdminUser(BasePermission):
 class BlockedIPViewSet(viewsets.ModelViewSet):
     """ViewSet for managing blocked IPs."""
 
-    queryset = BlockedIP.objects.all()
+    queryset = BlockedIP.objects.select_related("blocked_by")
     serializer_class = BlockedIPSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
     filterset_fields = ["is_active"]
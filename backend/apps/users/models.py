@@ -22,6 +22,14 @@ class UserRole(models.TextChoices):
     RECEPTIONIST = "RECEPTIONIST", "Receptionist"
 
 
+# Role groups behind the User permission properties (checked on every RBAC decision)
+_CLINICAL_ROLES = frozenset({UserRole.DOCTOR, UserRole.NURSE, UserRole.LAB_TECH})
+_LAB_ORDER_ROLES = frozenset({UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE})
+_PATIENT_VIEW_ROLES = frozenset(
+    {UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE, UserRole.LAB_TECH, UserRole.RECEPTIONIST}
+)
+
+
 class UserManager(BaseUserManager):
     """Custom user manager for email-based authentication."""
 
@@ -142,14 +150,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     @property
     def is_clinical_staff(self):
         """Check if user is clinical staff (doctor, nurse, lab tech)."""
-        return self.role in [UserRole.DOCTOR, UserRole.NURSE, UserRole.LAB_TECH]
+        return self.role in _CLINICAL_ROLES
 
     @property
     def can_order_labs(self):
         """Check if user can create lab orders."""
-        return self.role in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]
+        return self.role in _LAB_ORDER_ROLES
 
     @property
     def can_view_patients(self):
         """Check if user can view patient records."""
-        return self.role in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE, UserRole.LAB_TECH, UserRole.RECEPTIONIST]
+        return self.role in _PATIENT_VIEW_ROLES
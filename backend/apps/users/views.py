@@ -4,6 +4,10 @@ User views and viewsets.
 Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 """
 
+import logging
+
+from django.conf import settings
+
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
@@ -26,6 +30,8 @@ from .serializers import (
     UserUpdateSerializer,
 )
 
+logger = logging.getLogger(__name__)
+
 
 @extend_schema(tags=["auth"])
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -57,7 +63,7 @@ class LogoutView(generics.GenericAPIView):
 
     @extend_schema(
         request={"application/json": {"type": "object", "properties": {"refresh": {"type": "string"}}}},
-        responses={205: None},
+        responses={205: None, 501: None},
     )
     def post(self, request):
         """Blacklist the provided refresh token."""
@@ -67,12 +73,24 @@ class LogoutView(generics.GenericAPIView):
                 return Response({"error": "Refresh token is required"}, status=status.HTTP_400_BAD_REQUEST)
 
             token = RefreshToken(refresh_token)
-            token.blacklist()
+        except Exception:
+            return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(status=status.HTTP_205_RESET_CONTENT)
-        except Exception as e:
+        # Without the token_blacklist app the refresh token stays valid; don't report a logout that didn't happen
+        if not settings.JWT_ENABLE_BLACKLIST:
+            logger.warning(f"Logout for user {request.user.pk} not revoked: JWT_ENABLE_BLACKLIST is off")
+            return Response(
+                {"error": "Token revocation is not enabled on this server"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        try:
+            token.blacklist()
+        except Exception:
             return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response(status=status.HTTP_205_RESET_CONTENT)
+
 
 @extend_schema(tags=["auth"])
 class MeView(generics.RetrieveUpdateAPIView):
@@ -0,0 +1,25 @@
+"""
+drf-spectacular (OpenAPI) settings for Hospital Backend.
+
+Loaded on first access through the lazy SPECTACULAR_SETTINGS proxy in base.py.
+
+Copyright (c) 2025, Immanuel Njogu. All rights reserved.
+"""
+
+SPECTACULAR_SETTINGS = {
+    "TITLE": "Hospital Backend API",
+    "DESCRIPTION": "Enterprise-grade hospital management system API (MVP)",
+    "VERSION": "1.0.0",
+    "SERVE_INCLUDE_SCHEMA": False,
+    "SCHEMA_PATH_PREFIX": "/api/v1/",
+    "COMPONENT_SPLIT_REQUEST": True,
+    "TAGS": [
+        {"name": "auth", "description": "Authentication and authorization"},
+        {"name": "users", "description": "User management"},
+        {"name": "patients", "description": "Patient management"},
+        {"name": "lab-orders", "description": "Laboratory orders and results"},
+        {"name": "billing", "description": "Billing and M-Pesa payments"},
+        {"name": "analytics", "description": "Analytics and reporting"},
+        {"name": "security", "description": "Security and audit logs"},
+    ],
+}
@@ -8,8 +8,12 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 """
 
 import os
+from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 
+from django.utils.functional import LazyObject
+
 import environ
 
 # Build paths
@@ -28,13 +32,23 @@ env_file = ROOT_DIR / ".env"
 if env_file.exists():
     environ.Env.read_env(str(env_file))
 
+
+@lru_cache(maxsize=None)
+def _env_list(key, default=None):
+    """Parse a comma-separated env var once per process; required when no default is given."""
+    if default is None:
+        return tuple(env.list(key))
+    return tuple(env.list(key, default=list(default)))
+
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = env("DJANGO_SECRET_KEY", default="dev-secret-key-change-in-production-" + "x" * 50)
+_DEV_SECRET = "dev-secret-key-change-in-production-" + "x" * 50
+SECRET_KEY = env("DJANGO_SECRET_KEY", default=_DEV_SECRET)
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env("DJANGO_DEBUG", default=False)
 
-ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["localhost", "127.0.0.1"])
+ALLOWED_HOSTS = _env_list("DJANGO_ALLOWED_HOSTS", ("localhost", "127.0.0.1"))
 
 # Application definition
 INSTALLED_APPS = [
@@ -47,7 +61,6 @@ INSTALLED_APPS = [
     # Third-party apps
     "rest_framework",
     "rest_framework_simplejwt",
-    "rest_framework_simplejwt.token_blacklist",
     "django_filters",
     "corsheaders",
     "drf_spectacular",
@@ -61,6 +74,13 @@ INSTALLED_APPS = [
     "apps.security",
 ]
 
+# The token blacklist app revokes refresh tokens on logout and after rotation.
+# JWT_ENABLE_BLACKLIST=False drops it (and its migrations); logout then answers 501
+# because refresh tokens stay valid until they expire. Keep it on in production.
+JWT_ENABLE_BLACKLIST = env.bool("JWT_ENABLE_BLACKLIST", default=True)
+if JWT_ENABLE_BLACKLIST:
+    INSTALLED_APPS.append("rest_framework_simplejwt.token_blacklist")
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -98,8 +118,9 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
-# Database - overridden in environment-specific settings
-DATABASES = {"default": env.db("DATABASE_URL", default="sqlite:///db.sqlite3")}
+# Database - DSN parsed once here; environment-specific settings reuse _DB_DEFAULT
+_DB_DEFAULT = env.db("DATABASE_URL", default="sqlite:///db.sqlite3")
+DATABASES = {"default": _DB_DEFAULT}
 
 # Custom user model
 AUTH_USER_MODEL = "users.User"
@@ -144,7 +165,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.CursorPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.StandardCursorPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -160,18 +181,21 @@ REST_FRAMEWORK = {
         "user": "1000/hour",
         "auth": "10/minute",  # For login attempts
     },
+    # Resolved lazily by DRF's DefaultSchema descriptor, i.e. only when a schema is generated.
+    # Must stay global: drf-spectacular skips views whose schema is not its AutoSchema.
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "apps.core.exceptions.custom_exception_handler",
 }
 
 # JWT Settings
-from datetime import timedelta
+_access_min = env.int("JWT_ACCESS_TOKEN_LIFETIME", default=15)
+_refresh_days = env.int("JWT_REFRESH_TOKEN_LIFETIME", default=7)
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=env.int("JWT_ACCESS_TOKEN_LIFETIME", default=15)),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=env.int("JWT_REFRESH_TOKEN_LIFETIME", default=7)),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=_access_min),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=_refresh_days),
     "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": True,
+    "BLACKLIST_AFTER_ROTATION": JWT_ENABLE_BLACKLIST,
     "UPDATE_LAST_LOGIN": True,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
@@ -184,31 +208,24 @@ SIMPLE_JWT = {
 }
 
 # CORS Settings
-CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", default=["http://localhost:3000", "http://localhost:8000"])
+CORS_ALLOWED_ORIGINS = _env_list("CORS_ALLOWED_ORIGINS", ("http://localhost:3000", "http://localhost:8000"))
 CORS_ALLOW_CREDENTIALS = True
 
-# Spectacular (OpenAPI) settings
-SPECTACULAR_SETTINGS = {
-    "TITLE": "Hospital Backend API",
-    "DESCRIPTION": "Enterprise-grade hospital management system API (MVP)",
-    "VERSION": "1.0.0",
-    "SERVE_INCLUDE_SCHEMA": False,
-    "SCHEMA_PATH_PREFIX": "/api/v1/",
-    "COMPONENT_SPLIT_REQUEST": True,
-    "TAGS": [
-        {"name": "auth", "description": "Authentication and authorization"},
-        {"name": "users", "description": "User management"},
-        {"name": "patients", "description": "Patient management"},
-        {"name": "lab-orders", "description": "Laboratory orders and results"},
-        {"name": "billing", "description": "Billing and M-Pesa payments"},
-        {"name": "analytics", "description": "Analytics and reporting"},
-        {"name": "security", "description": "Security and audit logs"},
-    ],
-}
+
+# Spectacular (OpenAPI) settings - kept in _spectacular.py and loaded on first access
+class _LazySpectacular(LazyObject):
+    def _setup(self):
+        from config.settings._spectacular import SPECTACULAR_SETTINGS
+
+        self._wrapped = SPECTACULAR_SETTINGS
+
+
+SPECTACULAR_SETTINGS = _LazySpectacular()
 
 # Celery Configuration
-CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
-CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://localhost:6379/0")
+_CELERY_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
+CELERY_BROKER_URL = _CELERY_URL
+CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default=_CELERY_URL)
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
@@ -259,10 +276,6 @@ LOGGING = {
             "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
             "style": "{",
         },
-        "json": {
-            "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-            "format": "%(asctime)s %(name)s %(levelname)s %(message)s",
-        },
     },
     "handlers": {
         "console": {
@@ -299,6 +312,7 @@ SECURE_BROWSER_XSS_FILTER = True
 HOSPITAL_SETTINGS = {
     "ENABLE_C_MODULES": env.bool("ENABLE_C_MODULES", default=True),
     "PII_ENCRYPTION_KEY": env("PII_ENCRYPTION_KEY", default=None),
+    "REQUIRE_PII_ENCRYPTION_KEY": False,  # Enforced in CoreConfig.ready(); prod turns this on
     "AUDIT_LOG_RETENTION_DAYS": env.int("AUDIT_LOG_RETENTION_DAYS", default=2555),  # 7 years
     "MAX_APPOINTMENT_FUTURE_DAYS": env.int("MAX_APPOINTMENT_FUTURE_DAYS", default=90),
 }
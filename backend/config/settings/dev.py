@@ -3,14 +3,18 @@ Development settings for Hospital Backend.
 These settings are used during local development.
 """
 
+import os
+import sys
+
 from .base import *
+from .base import _DB_DEFAULT
 
 DEBUG = True
 
 ALLOWED_HOSTS = ["localhost", "127.0.0.1", "0.0.0.0"]
 
 # Database - SQLite for quick local development (PostgreSQL preferred)
-DATABASES = {"default": env.db("DATABASE_URL", default="sqlite:///db.sqlite3")}
+DATABASES = {"default": _DB_DEFAULT}
 
 # Additional dev apps
 INSTALLED_APPS += [
@@ -26,11 +30,13 @@ INTERNAL_IPS = ["127.0.0.1", "localhost"]
 # Allow all CORS in development
 CORS_ALLOW_ALL_ORIGINS = True
 
-# REST Framework - browsable API in dev with session auth for browser login
-REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
-    "rest_framework.renderers.JSONRenderer",
-    "rest_framework.renderers.BrowsableAPIRenderer",
-]
+# REST Framework - session auth for browser login; browsable API only when asked for
+# (DRF_BROWSABLE_API=1), so curl/Postman responses skip template rendering
+if env.bool("DRF_BROWSABLE_API", default=False):
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
 REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = [
     "rest_framework.authentication.SessionAuthentication",
     "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -43,10 +49,12 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
-# Cache - use local memory cache in development (no Redis required)
+# Cache - no-op by default in development (no Redis, no LocMem lock churn).
+# Set DEV_CACHE_BACKEND=django.core.cache.backends.locmem.LocMemCache when you need
+# real cache semantics (e.g. exercising rate limiting or IP blocking locally).
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": env("DEV_CACHE_BACKEND", default="django.core.cache.backends.dummy.DummyCache"),
         "LOCATION": "unique-snowflake",
     }
 }
@@ -63,6 +71,8 @@ SECURE_SSL_REDIRECT = False
 LOGIN_REDIRECT_URL = "/api/v1/"
 LOGOUT_REDIRECT_URL = "/api-auth/login/"
 
-print("🏥 Hospital Backend - Development Mode")
-print(f"📊 Database: {DATABASES['default']['ENGINE']}")
-print(f"🔧 Debug Mode: {DEBUG}")
+# Startup banner - interactive shells only; set HOSPITAL_BANNER=0 to silence
+if sys.stdout.isatty() and os.environ.get("HOSPITAL_BANNER", "1") == "1":
+    print("🏥 Hospital Backend - Development Mode")
+    print(f"📊 Database: {DATABASES['default']['ENGINE']}")
+    print(f"🔧 Debug Mode: {DEBUG}")
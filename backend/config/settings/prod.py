@@ -3,7 +3,11 @@ Production settings for Hospital Backend.
 These settings prioritize security, performance, and reliability.
 """
 
+import os
+import sys
+
 from .base import *
+from .base import _DB_DEFAULT, _env_list
 
 DEBUG = False
 
@@ -17,7 +21,7 @@ SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
 
 # Database - PostgreSQL required in production
-DATABASES = {"default": env.db("DATABASE_URL")}
+DATABASES = {"default": _DB_DEFAULT}
 
 # Ensure PostgreSQL is being used
 if "postgresql" not in DATABASES["default"]["ENGINE"]:
@@ -52,7 +56,11 @@ SESSION_CACHE_ALIAS = "default"
 # Static files - use WhiteNoise or CDN
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
 
-# Logging - JSON format for production
+# Logging - JSON format for production (registered here so dev/test never import pythonjsonlogger)
+LOGGING["formatters"]["json"] = {
+    "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
+    "format": "%(asctime)s %(name)s %(levelname)s %(message)s",
+}
 LOGGING["formatters"]["production"] = {
     "format": "%(asctime)s [%(process)d] [%(levelname)s] %(name)s: %(message)s",
     "datefmt": "%Y-%m-%d %H:%M:%S",
@@ -89,16 +97,17 @@ ADMIN_URL = env("ADMIN_URL", default="admin/")
 
 # CORS - strict in production
 CORS_ALLOW_ALL_ORIGINS = False
-CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS")
+CORS_ALLOWED_ORIGINS = _env_list("CORS_ALLOWED_ORIGINS")
 
-# PII encryption key - REQUIRED in production
-if not HOSPITAL_SETTINGS.get("PII_ENCRYPTION_KEY"):
-    raise ValueError("PII_ENCRYPTION_KEY must be set in production for encrypting patient data")
+# PII encryption key - REQUIRED in production (checked in CoreConfig.ready(), not at import)
+HOSPITAL_SETTINGS["REQUIRE_PII_ENCRYPTION_KEY"] = True
 
 # C modules - enabled in production for performance
 HOSPITAL_SETTINGS["ENABLE_C_MODULES"] = True
 
-print("🏥 Hospital Backend - Production Mode")
-print(f"🔒 Security: Enhanced")
-print(f"📊 Database: PostgreSQL")
-print(f"⚡ Cache: Redis")
+# Startup banner - interactive shells only; set HOSPITAL_BANNER=0 to silence
+if sys.stdout.isatty() and os.environ.get("HOSPITAL_BANNER", "1") == "1":
+    print("🏥 Hospital Backend - Production Mode")
+    print(f"🔒 Security: Enhanced")
+    print(f"📊 Database: PostgreSQL")
+    print(f"⚡ Cache: Redis")
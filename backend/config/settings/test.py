@@ -4,13 +4,15 @@ Used during pytest test runs.
 """
 
 from .base import *
+from .base import _DB_DEFAULT
 
 DEBUG = False
 
-# Use DATABASE_URL if provided (CI uses PostgreSQL), otherwise SQLite in-memory
-if env("DATABASE_URL", default=None):
+# Use DATABASE_URL if provided (CI uses PostgreSQL), otherwise SQLite in-memory.
+# FAST_TESTS=1 forces SQLite even when DATABASE_URL is set (no model relies on Postgres-only fields).
+if env("DATABASE_URL", default=None) and not env.bool("FAST_TESTS", default=False):
     DATABASES = {
-        "default": env.db("DATABASE_URL"),
+        "default": _DB_DEFAULT,
     }
     DATABASES["default"]["ATOMIC_REQUESTS"] = True
 else:
@@ -23,9 +25,22 @@ else:
         }
     }
 
-# Password hashers - fast for testing
+
+class DisableMigrations:
+    """Build test tables straight from models instead of replaying migrations."""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+MIGRATION_MODULES = DisableMigrations()
+
+# Password hashers - plain text for testing (no salt generation or digest per user)
 PASSWORD_HASHERS = [
-    "django.contrib.auth.hashers.MD5PasswordHasher",
+    "tests.hashers.PlaintextPasswordHasher",
 ]
 
 # Email backend - memory for testing
@@ -33,7 +33,7 @@ def ping(request):
 
 urlpatterns = [
     # Admin
-    path(settings.ADMIN_URL if hasattr(settings, "ADMIN_URL") else "admin/", admin.site.urls),
+    path(getattr(settings, "ADMIN_URL", "admin/"), admin.site.urls),
     # Health checks
     path("health/", health_check, name="health"),
     path("ping/", ping, name="ping"),
@@ -65,8 +65,10 @@ urlpatterns = [
 
 # Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+    urlpatterns += [
+        *static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT),
+        *static(settings.STATIC_URL, document_root=settings.STATIC_ROOT),
+    ]
 
     # DRF browsable API login/logout
     urlpatterns += [
@@ -10,11 +10,16 @@ Usage:
     Or run directly:
     cd backend && python scripts/seed_demo_data.py
 
+    Set SEED_SETTINGS to seed against another settings module
+    (defaults to config.settings.dev).
+
 © 2025 Immanuel Njogu. All rights reserved.
 """
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from pathlib import Path
 
 # Add backend to path if running directly
@@ -22,17 +27,19 @@ backend_dir = Path(__file__).resolve().parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", os.environ.get("SEED_SETTINGS", "config.settings.dev"))
 
 import django
 
 django.setup()
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.db import transaction
 
 from apps.lab_orders.models import TestCategory, TestType
 from apps.patients.models import BloodType, Gender, Patient
+from apps.users.models import UserRole
 
 User = get_user_model()
 
@@ -43,7 +50,7 @@ DEMO_USERS = [
         "password": "admin123!",
         "first_name": "System",
         "last_name": "Administrator",
-        "role": "ADMIN",
+        "role": UserRole.ADMIN,
         "is_staff": True,
         "is_superuser": True,
     },
@@ -52,7 +59,7 @@ DEMO_USERS = [
         "password": "doctor123!",
         "first_name": "John",
         "last_name": "Smith",
-        "role": "DOCTOR",
+        "role": UserRole.DOCTOR,
         "is_staff": False,
         "is_superuser": False,
     },
@@ -61,7 +68,7 @@ DEMO_USERS = [
         "password": "nurse123!",
         "first_name": "Jane",
         "last_name": "Doe",
-        "role": "NURSE",
+        "role": UserRole.NURSE,
         "is_staff": False,
         "is_superuser": False,
     },
@@ -70,7 +77,7 @@ DEMO_USERS = [
         "password": "lab123!",
         "first_name": "Mike",
         "last_name": "Johnson",
-        "role": "LAB_TECH",
+        "role": UserRole.LAB_TECH,
         "is_staff": False,
         "is_superuser": False,
     },
@@ -85,23 +92,36 @@ def create_demo_users() -> None:
     skipped_count = 0
 
     with transaction.atomic():
+        existing = set(User.objects.filter(email__in=[u["email"] for u in DEMO_USERS]).values_list("email", flat=True))
+
+        to_create = []
+        msgs = []
         for user_data in DEMO_USERS:
             email = user_data["email"]
-            password = user_data.pop("password")
-
-            user, created = User.objects.get_or_create(
-                email=email,
-                defaults=user_data,
-            )
 
-            if created:
-                user.set_password(password)
-                user.save()
-                print(f"  ✓ Created: {email} ({user_data['role']})")
-                created_count += 1
-            else:
-                print(f"  - Skipped (exists): {email}")
+            if email in existing:
+                msgs.append(f"  - Skipped (exists): {email}")
                 skipped_count += 1
+                continue
+
+            to_create.append(user_data)
+            msgs.append(f"  ✓ Created: {email} ({user_data['role']})")
+            created_count += 1
+
+        # Hash up front so the whole batch goes in as one INSERT (bulk_create skips save()).
+        # PBKDF2 runs in hashlib without the GIL, so the KDF rounds overlap across threads.
+        with ThreadPoolExecutor() as pool:
+            hashes = list(pool.map(make_password, [u["password"] for u in to_create]))
+        new_users = [
+            User(password=hashed, **{k: v for k, v in user_data.items() if k != "password"})
+            for user_data, hashed in zip(to_create, hashes)
+        ]
+
+        User.objects.bulk_create(new_users, ignore_conflicts=True, batch_size=100)
+
+    # One write for the whole batch rather than a print() per row
+    if msgs:
+        sys.stdout.write("\n".join(msgs) + "\n")
 
     print(f"\nSummary: {created_count} created, {skipped_count} skipped")
 
@@ -125,7 +145,7 @@ DEMO_PATIENTS = [
         "first_name": "Alice",
         "last_name": "Johnson",
         "middle_name": "Marie",
-        "date_of_birth": "1985-03-15",
+        "date_of_birth": date(1985, 3, 15),
         "gender": Gender.FEMALE,
         "phone": "+15551234567",
         "email": "alice.johnson@email.com",
@@ -143,7 +163,7 @@ DEMO_PATIENTS = [
     {
         "first_name": "Robert",
         "last_name": "Williams",
-        "date_of_birth": "1972-08-22",
+        "date_of_birth": date(1972, 8, 22),
         "gender": Gender.MALE,
         "phone": "+15552345678",
         "email": "robert.williams@email.com",
@@ -163,7 +183,7 @@ DEMO_PATIENTS = [
         "first_name": "Maria",
         "last_name": "Garcia",
         "middle_name": "Elena",
-        "date_of_birth": "1990-12-01",
+        "date_of_birth": date(1990, 12, 1),
         "gender": Gender.FEMALE,
         "phone": "+15553456789",
         "email": "maria.garcia@email.com",
@@ -181,7 +201,7 @@ DEMO_PATIENTS = [
     {
         "first_name": "James",
         "last_name": "Brown",
-        "date_of_birth": "1958-05-10",
+        "date_of_birth": date(1958, 5, 10),
         "gender": Gender.MALE,
         "phone": "+15554567890",
         "email": "james.brown@email.com",
@@ -200,7 +220,7 @@ DEMO_PATIENTS = [
         "first_name": "Emily",
         "last_name": "Davis",
         "middle_name": "Rose",
-        "date_of_birth": "2005-07-20",
+        "date_of_birth": date(2005, 7, 20),
         "gender": Gender.FEMALE,
         "phone": "+15555678901",
         "email": "emily.davis@email.com",
@@ -220,42 +240,38 @@ DEMO_PATIENTS = [
 
 def create_demo_patients() -> None:
     """Create demo patients if they don't exist."""
-    from datetime import datetime
-
     print("\nCreating demo patients...")
 
     created_count = 0
     skipped_count = 0
 
     with transaction.atomic():
-        for patient_data in DEMO_PATIENTS:
-            # Convert date string to date object
-            dob_str = patient_data.pop("date_of_birth")
-            dob = datetime.strptime(dob_str, "%Y-%m-%d").date()
+        # One query for every (name, DOB) already present instead of a lookup per patient
+        existing = set(
+            Patient.objects.filter(last_name__in=[p["last_name"] for p in DEMO_PATIENTS]).values_list(
+                "first_name", "last_name", "date_of_birth"
+            )
+        )
 
+        new_patients = []
+        msgs = []
+        for patient_data in DEMO_PATIENTS:
             # Check if patient already exists (by name and DOB)
-            existing = Patient.objects.filter(
-                first_name=patient_data["first_name"],
-                last_name=patient_data["last_name"],
-                date_of_birth=dob,
-            ).first()
-
-            if existing:
-                print(f"  - Skipped (exists): {patient_data['first_name']} {patient_data['last_name']}")
+            if (patient_data["first_name"], patient_data["last_name"], patient_data["date_of_birth"]) in existing:
+                msgs.append(f"  - Skipped (exists): {patient_data['first_name']} {patient_data['last_name']}")
                 skipped_count += 1
-                # Restore for next run
-                patient_data["date_of_birth"] = dob_str
                 continue
 
-            patient = Patient.objects.create(
-                date_of_birth=dob,
-                **patient_data,
-            )
-            print(f"  ✓ Created: {patient.full_name} (MRN: {patient.mrn})")
+            # MRN is assigned by the field default at construction, so bulk_create needs no save()
+            patient = Patient(**patient_data)
+            new_patients.append(patient)
+            msgs.append(f"  ✓ Created: {patient.full_name} (MRN: {patient.mrn})")
             created_count += 1
 
-            # Restore for next run
-            patient_data["date_of_birth"] = dob_str
+        Patient.objects.bulk_create(new_patients, ignore_conflicts=True, batch_size=100)
+
+    if msgs:
+        sys.stdout.write("\n".join(msgs) + "\n")
 
     print(f"\nSummary: {created_count} created, {skipped_count} skipped")
 
@@ -345,31 +361,33 @@ def create_demo_test_types() -> None:
     skipped_count = 0
 
     with transaction.atomic():
+        existing = set(
+            TestType.objects.filter(code__in=[t["code"] for t in DEMO_TEST_TYPES]).values_list("code", flat=True)
+        )
+
+        new_test_types = []
+        msgs = []
         for test_data in DEMO_TEST_TYPES:
             code = test_data["code"]
 
-            test_type, created = TestType.objects.get_or_create(
-                code=code,
-                defaults=test_data,
-            )
-
-            if created:
-                print(f"  ✓ Created: {code} - {test_data['name']}")
-                created_count += 1
-            else:
-                print(f"  - Skipped (exists): {code}")
+            if code in existing:
+                msgs.append(f"  - Skipped (exists): {code}")
                 skipped_count += 1
+                continue
+
+            new_test_types.append(TestType(**test_data))
+            msgs.append(f"  ✓ Created: {code} - {test_data['name']}")
+            created_count += 1
+
+        TestType.objects.bulk_create(new_test_types, ignore_conflicts=True, batch_size=100)
+
+    if msgs:
+        sys.stdout.write("\n".join(msgs) + "\n")
 
     print(f"\nSummary: {created_count} created, {skipped_count} skipped")
 
 
 if __name__ == "__main__":
-    # Re-add passwords for credential display (they were popped during creation)
-    DEMO_USERS[0]["password"] = "admin123!"
-    DEMO_USERS[1]["password"] = "doctor123!"
-    DEMO_USERS[2]["password"] = "nurse123!"
-    DEMO_USERS[3]["password"] = "lab123!"
-
     print_credentials()
     print()
     create_demo_users()
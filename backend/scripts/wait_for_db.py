@@ -17,19 +17,23 @@ def wait_for_db():
     """Wait for database to become available."""
     db_conn = connections["default"]
     max_retries = 30
-    retry_delay = 2
+    max_delay = 2.0
+    delay = 0.1  # Exponential backoff: 0.1, 0.2, 0.4, ... capped at max_delay
 
     print("🔄 Waiting for database...")
 
     for i in range(max_retries):
         try:
-            db_conn.ensure_connection()
+            # Round-trip a query rather than trusting connection state
+            with db_conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
             print("✅ Database is ready!")
             return True
         except OperationalError as e:
             if i < max_retries - 1:
-                print(f"⏳ Database unavailable, waiting {retry_delay}s... (attempt {i+1}/{max_retries})")
-                time.sleep(retry_delay)
+                print(f"⏳ Database unavailable, waiting {delay:.1f}s... (attempt {i+1}/{max_retries})")
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
             else:
                 print(f"❌ Database not available after {max_retries} attempts")
                 print(f"Error: {e}")
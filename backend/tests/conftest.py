@@ -4,12 +4,62 @@ Pytest configuration and fixtures for Hospital Backend tests.
 Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 """
 
+import copy
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+
 from rest_framework.test import APIClient
 
 import pytest
+import responses
+import time_machine
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from apps.billing.models import Payment, PaymentMethod, PaymentStatus
+from apps.security import signals
 from apps.users.models import User, UserRole
 
+# Fixed "now" for the whole run: date.today()/timezone.now() are stable across tests and
+# midnight, so date-derived fixture values (due dates, invoice numbers) never drift.
+FROZEN_NOW = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def frozen_time():
+    """Freeze the clock at FROZEN_NOW for the session."""
+    with time_machine.travel(FROZEN_NOW, tick=False):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def mocked_requests():
+    """
+    Intercept every HTTP call made through ``requests``.
+
+    Unregistered URLs raise ConnectionError straight away instead of reaching
+    the network (e.g. Safaricom's Daraja API); tests register the responses
+    they expect on the yielded mock.
+    """
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield rsps
+
+
+@pytest.fixture
+def disable_security_signals():
+    """Disconnect the login/logout SecurityEvent receivers for tests that don't assert on them."""
+    receivers = [
+        (user_logged_in, signals.log_login_success),
+        (user_logged_out, signals.log_logout),
+        (user_login_failed, signals.log_login_failed),
+    ]
+    for signal, receiver in receivers:
+        signal.disconnect(receiver)
+    yield
+    for signal, receiver in receivers:
+        signal.connect(receiver)
+
 
 @pytest.fixture
 def api_client():
@@ -17,99 +67,189 @@ def api_client():
     return APIClient()
 
 
+# create_user() arguments for the one user each role fixture hands out
+_ROLE_USERS = {
+    UserRole.ADMIN: {
+        "email": "admin@hospital.test",
+        "password": "AdminPass123!",
+        "first_name": "Admin",
+        "last_name": "User",
+        "role": UserRole.ADMIN,
+        "is_staff": True,
+    },
+    UserRole.DOCTOR: {
+        "email": "doctor@hospital.test",
+        "password": "DoctorPass123!",
+        "first_name": "John",
+        "last_name": "Doctor",
+        "role": UserRole.DOCTOR,
+        "license_number": "MD12345",
+        "department": "Internal Medicine",
+    },
+    UserRole.NURSE: {
+        "email": "nurse@hospital.test",
+        "password": "NursePass123!",
+        "first_name": "Jane",
+        "last_name": "Nurse",
+        "role": UserRole.NURSE,
+        "license_number": "RN67890",
+        "department": "Emergency",
+    },
+    UserRole.LAB_TECH: {
+        "email": "labtech@hospital.test",
+        "password": "LabTechPass123!",
+        "first_name": "Lab",
+        "last_name": "Technician",
+        "role": UserRole.LAB_TECH,
+        "department": "Laboratory",
+    },
+    UserRole.RECEPTIONIST: {
+        "email": "receptionist@hospital.test",
+        "password": "ReceptionPass123!",
+        "first_name": "Front",
+        "last_name": "Desk",
+        "role": UserRole.RECEPTIONIST,
+    },
+}
+
+
+@pytest.fixture(scope="session")
+def user_factory(django_db_setup, django_db_blocker):
+    """
+    Return ``make(role)``, which gives back the session's user for that role.
+
+    Every role user is created once, up front and outside the per-test transaction.
+    Each call returns a copy, so in-memory changes made by one test don't leak.
+    """
+    with django_db_blocker.unblock():
+        users = {role: User.objects.create_user(**fields) for role, fields in _ROLE_USERS.items()}
+
+    def make(role):
+        return copy.copy(users[role])
+
+    yield make
+    with django_db_blocker.unblock():
+        User.objects.filter(pk__in=[user.pk for user in users.values()]).delete()
+
+
+@pytest.fixture(scope="session")
+def admin_tokens(user_factory, django_db_blocker):
+    """Return a refresh/access JWT pair for the admin user, signed once for the session."""
+    # for_user records the token in the blacklist app's OutstandingToken table
+    with django_db_blocker.unblock():
+        refresh = RefreshToken.for_user(user_factory(UserRole.ADMIN))
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+@pytest.fixture
+def admin_user(db, user_factory):
+    """Return the admin user."""
+    return user_factory(UserRole.ADMIN)
+
+
 @pytest.fixture
-def admin_user(db):
-    """Create and return an admin user."""
-    return User.objects.create_user(
-        email="admin@hospital.test",
-        password="AdminPass123!",
-        first_name="Admin",
-        last_name="User",
-        role=UserRole.ADMIN,
-        is_staff=True,
-    )
+def doctor_user(db, user_factory):
+    """Return the doctor user."""
+    return user_factory(UserRole.DOCTOR)
 
 
 @pytest.fixture
-def doctor_user(db):
-    """Create and return a doctor user."""
-    return User.objects.create_user(
-        email="doctor@hospital.test",
-        password="DoctorPass123!",
-        first_name="John",
-        last_name="Doctor",
-        role=UserRole.DOCTOR,
-        license_number="MD12345",
-        department="Internal Medicine",
-    )
+def nurse_user(db, user_factory):
+    """Return the nurse user."""
+    return user_factory(UserRole.NURSE)
 
 
 @pytest.fixture
-def nurse_user(db):
-    """Create and return a nurse user."""
-    return User.objects.create_user(
-        email="nurse@hospital.test",
-        password="NursePass123!",
-        first_name="Jane",
-        last_name="Nurse",
-        role=UserRole.NURSE,
-        license_number="RN67890",
-        department="Emergency",
-    )
+def lab_tech_user(db, user_factory):
+    """Return the lab technician user."""
+    return user_factory(UserRole.LAB_TECH)
 
 
 @pytest.fixture
-def lab_tech_user(db):
-    """Create and return a lab technician user."""
-    return User.objects.create_user(
-        email="labtech@hospital.test",
-        password="LabTechPass123!",
-        first_name="Lab",
-        last_name="Technician",
-        role=UserRole.LAB_TECH,
-        department="Laboratory",
-    )
+def receptionist_user(db, user_factory):
+    """Return the receptionist user."""
+    return user_factory(UserRole.RECEPTIONIST)
 
 
 @pytest.fixture
-def receptionist_user(db):
-    """Create and return a receptionist user."""
-    return User.objects.create_user(
-        email="receptionist@hospital.test",
-        password="ReceptionPass123!",
-        first_name="Front",
-        last_name="Desk",
-        role=UserRole.RECEPTIONIST,
-    )
+def payments_factory(db):
+    """
+    Return ``make(invoice, n, **overrides)``, which inserts ``n`` payment rows in one INSERT.
+
+    Goes through bulk_create, so no save() or post_save signal runs; use it
+    where a test only needs the payments to exist.
+    """
+
+    def make(invoice, n, **overrides):
+        fields = {
+            "payment_method": PaymentMethod.CASH,
+            "amount": Decimal("100.00"),
+            "status": PaymentStatus.COMPLETED,
+            **overrides,
+        }
+        return Payment.objects.bulk_create([Payment(invoice=invoice, **fields) for _ in range(n)])
+
+    return make
+
+
+@pytest.fixture
+def make_payment(payments_factory):
+    """Return ``make(invoice, **overrides)``, which inserts a single payment row."""
+
+    def make(invoice, **overrides):
+        (payment,) = payments_factory(invoice, 1, **overrides)
+        return payment
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def client_factory():
+    """
+    Return ``get(role)``, which gives back one APIClient per role for the whole session.
+
+    Each role keeps its own instance so tests can use e.g. the admin and doctor
+    clients side by side.
+    """
+    clients = {}
+
+    def get(role):
+        if role not in clients:
+            clients[role] = APIClient()
+        return clients[role]
+
+    return get
+
+
+def _authenticated(client, user):
+    """Authenticate a shared client as ``user`` for one test, then reset it."""
+    client.force_authenticate(user=user)
+    yield client
+    # Not client.logout(): with no session cookie that creates and saves a session row
+    client.force_authenticate(user=None)
+    client.credentials()
+    client.cookies.clear()
 
 
 @pytest.fixture
-def authenticated_admin_client(admin_user):
+def authenticated_admin_client(client_factory, admin_user):
     """Return an API client authenticated as admin."""
-    client = APIClient()
-    client.force_authenticate(user=admin_user)
-    return client
+    yield from _authenticated(client_factory(UserRole.ADMIN), admin_user)
 
 
 @pytest.fixture
-def authenticated_doctor_client(doctor_user):
+def authenticated_doctor_client(client_factory, doctor_user):
     """Return an API client authenticated as doctor."""
-    client = APIClient()
-    client.force_authenticate(user=doctor_user)
-    return client
+    yield from _authenticated(client_factory(UserRole.DOCTOR), doctor_user)
 
 
 @pytest.fixture
-def authenticated_nurse_client(nurse_user):
+def authenticated_nurse_client(client_factory, nurse_user):
     """Return an API client authenticated as nurse."""
-    client = APIClient()
-    client.force_authenticate(user=nurse_user)
-    return client
+    yield from _authenticated(client_factory(UserRole.NURSE), nurse_user)
 
 
 @pytest.fixture
-def authenticated_lab_tech_client(lab_tech_user):
+def authenticated_lab_tech_client(client_factory, lab_tech_user):
     """Return an API client authenticated as lab tech."""
-    client = APIClient()
-    client.force_authenticate(user=lab_tech_user)
-    return client
+    yield from _authenticated(client_factory(UserRole.LAB_TECH), lab_tech_user)
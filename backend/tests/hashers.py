@@ -0,0 +1,38 @@
+"""
+Password hasher for the test suite.
+
+Stores passwords in plain text so fixture users cost no hashing or salt
+generation. Never reference this outside config/settings/test.py.
+
+Copyright (c) 2025, Immanuel Njogu. All rights reserved.
+"""
+
+from django.contrib.auth.hashers import BasePasswordHasher, mask_hash
+from django.utils.crypto import constant_time_compare
+
+
+class PlaintextPasswordHasher(BasePasswordHasher):
+    """Unsalted, unhashed password storage: ``plain$$<password>``."""
+
+    algorithm = "plain"
+
+    def salt(self):
+        return ""
+
+    def encode(self, password, salt):
+        return f"{self.algorithm}$${password}"
+
+    def decode(self, encoded):
+        algorithm, salt, password = encoded.split("$", 2)
+        assert algorithm == self.algorithm
+        return {"algorithm": algorithm, "hash": password, "salt": salt}
+
+    def verify(self, password, encoded):
+        return constant_time_compare(encoded, self.encode(password, ""))
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {"algorithm": decoded["algorithm"], "hash": mask_hash(decoded["hash"])}
+
+    def harden_runtime(self, password, encoded):
+        pass
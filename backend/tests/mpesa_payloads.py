@@ -0,0 +1,38 @@
+"""
+Sample Daraja STK Push callback bodies shared by the M-Pesa tests.
+
+Both target CheckoutRequestID 67890. Treat them as read-only; copy before
+changing anything.
+
+Copyright (c) 2025, Immanuel Njogu. All rights reserved.
+"""
+
+SUCCESS_CALLBACK = {
+    "Body": {
+        "stkCallback": {
+            "MerchantRequestID": "12345",
+            "CheckoutRequestID": "67890",
+            "ResultCode": 0,
+            "ResultDesc": "Success",
+            "CallbackMetadata": {
+                "Item": [
+                    {"Name": "Amount", "Value": 500},
+                    {"Name": "MpesaReceiptNumber", "Value": "ABC123XYZ"},
+                    {"Name": "TransactionDate", "Value": 20240115123456},
+                    {"Name": "PhoneNumber", "Value": 254700000000},
+                ]
+            },
+        }
+    }
+}
+
+FAILURE_CALLBACK = {
+    "Body": {
+        "stkCallback": {
+            "MerchantRequestID": "12345",
+            "CheckoutRequestID": "67890",
+            "ResultCode": 1032,
+            "ResultDesc": "Request cancelled by user",
+        }
+    }
+}
@@ -17,82 +17,162 @@ import pytest
 from apps.billing.models import Invoice, InvoiceItem, InvoiceStatus, Payment, PaymentMethod, PaymentStatus, Service
 from apps.lab_orders.models import LabOrder, TestType
 from apps.patients.models import Patient
+from apps.users.models import UserRole
 
+# Query budget per analytics request; keeps the views on aggregates rather than per-figure queries
+MAX_ANALYTICS_QUERIES = 10
 
-@pytest.fixture
-def setup_analytics_data(db, admin_user, doctor_user):
-    """Create test data for analytics."""
-    # Create patients
-    patients = []
-    for i in range(5):
-        patient = Patient.objects.create(
-            first_name=f"Patient{i}",
-            last_name=f"Test{i}",
-            date_of_birth=date(1990 - i * 5, 1, 1),
-            gender="M" if i % 2 == 0 else "F",
-        )
-        patients.append(patient)
-
-    # Create services
-    service = Service.objects.create(
-        code="LAB001",
-        name="Blood Test",
-        category="LABORATORY",
-        unit_price=Decimal("500.00"),
-    )
 
-    # Create invoices and payments
-    for patient in patients[:3]:
-        invoice = Invoice.objects.create(
-            patient=patient,
-            due_date=date.today() + timedelta(days=30),
-            status=InvoiceStatus.PAID,
-            created_by=admin_user,
+@pytest.fixture(scope="module")
+def lab_service(django_db_setup, django_db_blocker):
+    """Return the LAB001 service for the module, creating it if no earlier run left one behind."""
+    with django_db_blocker.unblock():
+        service, created = Service.objects.get_or_create(
+            code="LAB001",
+            defaults={"name": "Blood Test", "category": "LABORATORY", "unit_price": Decimal("500.00")},
         )
-        InvoiceItem.objects.create(
-            invoice=invoice,
-            service=service,
-            quantity=1,
-            unit_price=service.unit_price,
+    yield service
+    if created:
+        with django_db_blocker.unblock():
+            service.delete()
+
+
+@pytest.fixture(scope="module")
+def cbc_test_type(django_db_setup, django_db_blocker):
+    """Return the CBC test type for the module, creating it if no earlier run left one behind."""
+    with django_db_blocker.unblock():
+        test_type, created = TestType.objects.get_or_create(
+            code="CBC",
+            defaults={"name": "Complete Blood Count", "category": "HEMATOLOGY"},
         )
-        invoice.recalculate()
-
-        Payment.objects.create(
-            invoice=invoice,
-            payment_method=PaymentMethod.MPESA,
-            amount=Decimal("500.00"),
-            status=PaymentStatus.COMPLETED,
+    yield test_type
+    if created:
+        with django_db_blocker.unblock():
+            test_type.delete()
+
+
+@pytest.fixture(scope="class")
+def setup_analytics_data(django_db_setup, django_db_blocker, user_factory, lab_service, cbc_test_type):
+    """
+    Create test data for analytics (one bulk INSERT per table).
+
+    Built once per test class and committed outside the per-test transaction;
+    the analytics tests only read it. Rows left behind by an earlier run are
+    reused, and only the rows this run inserted are removed when the class finishes.
+    """
+    with django_db_blocker.unblock():
+        data = _create_analytics_data(
+            user_factory(UserRole.ADMIN), user_factory(UserRole.DOCTOR), lab_service, cbc_test_type
         )
-
-    # Create test types for lab orders
-    test_type = TestType.objects.create(
-        code="CBC",
-        name="Complete Blood Count",
-        category="HEMATOLOGY",
+    yield data
+    created = data["created"]
+    with django_db_blocker.unblock():
+        LabOrder.objects.filter(pk__in=[order.pk for order in created["lab_orders"]]).delete()
+        Payment.objects.filter(invoice__in=created["invoices"]).delete()
+        Invoice.objects.filter(pk__in=[invoice.pk for invoice in created["invoices"]]).delete()
+        Patient.objects.filter(pk__in=[patient.pk for patient in created["patients"]]).delete()
+
+
+def _missing(model, field, keys):
+    """Return the ``keys`` no ``model`` row has in ``field`` yet, found with one query."""
+    existing = set(model.objects.filter(**{f"{field}__in": keys}).values_list(field, flat=True))
+    return [key for key in keys if key not in existing]
+
+
+def _create_analytics_data(admin_user, doctor_user, service, test_type):
+    """Insert whatever part of the analytics dataset is missing and return it."""
+    # Create patients, skipping any left behind by an earlier run against the same database
+    last_names = [f"Test{i}" for i in range(5)]
+    missing = set(_missing(Patient, "last_name", last_names))
+    created_patients = Patient.objects.bulk_create(
+        [
+            Patient(
+                first_name=f"Patient{i}",
+                last_name=last_name,
+                date_of_birth=date(1990 - i * 5, 1, 1),
+                gender="M" if i % 2 == 0 else "F",
+            )
+            for i, last_name in enumerate(last_names)
+            if last_name in missing
+        ],
+        batch_size=100,
+    )
+    patients = list(Patient.objects.filter(last_name__in=last_names).order_by("last_name"))
+
+    # Create invoices and payments. bulk_create skips save()/signals, so invoice numbers
+    # and the totals recalculate() would produce are filled in here. Items and payments
+    # only go on new invoices; a left-over invoice already has its own.
+    invoice_patients = {f"INV-TEST-{i:04d}": patient for i, patient in enumerate(patients[:3])}
+    invoices = Invoice.objects.bulk_create(
+        [
+            Invoice(
+                invoice_number=invoice_number,
+                patient=invoice_patients[invoice_number],
+                due_date=date.today() + timedelta(days=30),
+                status=InvoiceStatus.PAID,
+                subtotal=service.unit_price,
+                total_amount=service.unit_price,
+                balance_due=service.unit_price,
+                created_by=admin_user,
+            )
+            for invoice_number in _missing(Invoice, "invoice_number", list(invoice_patients))
+        ]
+    )
+    InvoiceItem.objects.bulk_create(
+        [
+            InvoiceItem(
+                invoice=invoice,
+                service=service,
+                quantity=1,
+                unit_price=service.unit_price,
+                total_price=service.unit_price,
+            )
+            for invoice in invoices
+        ]
+    )
+    Payment.objects.bulk_create(
+        [
+            Payment(
+                invoice=invoice,
+                payment_method=PaymentMethod.MPESA,
+                amount=Decimal("500.00"),
+                status=PaymentStatus.COMPLETED,
+            )
+            for invoice in invoices
+        ]
     )
 
     # Create lab orders - LabOrder uses test_type directly
-    for patient in patients[:2]:
-        LabOrder.objects.create(
-            patient=patient,
-            ordering_provider=doctor_user,
-            test_type=test_type,
-            status="RESULTED",
-        )
+    order_patients = {f"LAB-TEST-{i:04d}": patient for i, patient in enumerate(patients[:2])}
+    lab_orders = LabOrder.objects.bulk_create(
+        [
+            LabOrder(
+                order_number=order_number,
+                patient=order_patients[order_number],
+                ordering_provider=doctor_user,
+                test_type=test_type,
+                status="RESULTED",
+            )
+            for order_number in _missing(LabOrder, "order_number", list(order_patients))
+        ]
+    )
 
     return {
         "patients": patients,
         "service": service,
+        "test_type": test_type,
+        "created": {"patients": created_patients, "invoices": invoices, "lab_orders": lab_orders},
     }
 
 
 class TestDashboardStats:
     """Tests for dashboard statistics endpoint."""
 
-    def test_get_dashboard_stats(self, authenticated_admin_client, setup_analytics_data):
+    def test_get_dashboard_stats(self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries):
         """Test getting dashboard statistics."""
         url = reverse("dashboard-stats")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert "patients" in response.data
@@ -101,10 +181,13 @@ class TestDashboardStats:
         assert "invoices" in response.data
         assert "staff" in response.data
 
-    def test_dashboard_patient_stats(self, authenticated_admin_client, setup_analytics_data):
+    def test_dashboard_patient_stats(
+        self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries
+    ):
         """Test patient statistics in dashboard."""
         url = reverse("dashboard-stats")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         assert response.data["patients"]["total"] >= 5
 
@@ -119,10 +202,13 @@ class TestDashboardStats:
 class TestRevenueAnalytics:
     """Tests for revenue analytics endpoint."""
 
-    def test_get_revenue_analytics(self, authenticated_admin_client, setup_analytics_data):
+    def test_get_revenue_analytics(
+        self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries
+    ):
         """Test getting revenue analytics."""
         url = reverse("revenue-analytics")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert "daily_trend" in response.data
@@ -130,18 +216,24 @@ class TestRevenueAnalytics:
         assert "monthly_trend" in response.data
         assert "top_services" in response.data
 
-    def test_revenue_with_custom_days(self, authenticated_admin_client, setup_analytics_data):
+    def test_revenue_with_custom_days(
+        self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries
+    ):
         """Test revenue analytics with custom day range."""
         url = reverse("revenue-analytics")
-        response = authenticated_admin_client.get(url, {"days": 7})
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url, {"days": 7})
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data["period_days"] == 7
 
-    def test_revenue_by_payment_method(self, authenticated_admin_client, setup_analytics_data):
+    def test_revenue_by_payment_method(
+        self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries
+    ):
         """Test revenue breakdown by payment method."""
         url = reverse("revenue-analytics")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         # Should have M-Pesa payments from setup data
         methods = {item["method"] for item in response.data["by_payment_method"]}
@@ -187,10 +279,11 @@ class TestPatientAnalytics:
 class TestLabAnalytics:
     """Tests for laboratory analytics endpoint."""
 
-    def test_get_lab_analytics(self, authenticated_admin_client, setup_analytics_data):
+    def test_get_lab_analytics(self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries):
         """Test getting lab analytics."""
         url = reverse("lab-analytics")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert "total_orders" in response.data
@@ -199,10 +292,13 @@ class TestLabAnalytics:
         assert "top_test_types" in response.data
         assert "avg_turnaround_hours" in response.data
 
-    def test_lab_orders_by_status(self, authenticated_admin_client, setup_analytics_data):
+    def test_lab_orders_by_status(
+        self, authenticated_admin_client, setup_analytics_data, django_assert_max_num_queries
+    ):
         """Test lab orders by status breakdown."""
         url = reverse("lab-analytics")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(MAX_ANALYTICS_QUERIES):
+            response = authenticated_admin_client.get(url)
 
         # Should have resulted orders from setup
         status_counts = response.data["orders_by_status"]
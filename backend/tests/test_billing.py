@@ -6,7 +6,6 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 
 from datetime import date, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
 
 from django.urls import reverse
 
@@ -18,38 +17,47 @@ from apps.billing.models import (
     Invoice,
     InvoiceItem,
     InvoiceStatus,
-    Payment,
     PaymentMethod,
     PaymentStatus,
     Service,
     ServiceCategory,
 )
-from apps.billing.mpesa import MpesaService
+from apps.billing.mpesa import MpesaConfig
 from apps.patients.models import Patient
 
+from .mpesa_payloads import FAILURE_CALLBACK, SUCCESS_CALLBACK
 
-@pytest.fixture
-def test_patient(db):
-    """Create a test patient."""
-    return Patient.objects.create(
-        first_name="Test",
-        last_name="Patient",
-        date_of_birth=date(1990, 1, 1),
-        email="patient@test.com",
-        phone="+254700000000",
-    )
 
-
-@pytest.fixture
-def test_service(db):
-    """Create a test service."""
-    return Service.objects.create(
-        code="LAB001",
-        name="Complete Blood Count",
-        description="Full blood count test",
-        category=ServiceCategory.LABORATORY,
-        unit_price=Decimal("500.00"),
-    )
+@pytest.fixture(scope="module")
+def test_patient(django_db_setup, django_db_blocker):
+    """Create a test patient once for the module."""
+    with django_db_blocker.unblock():
+        patient = Patient.objects.create(
+            first_name="Test",
+            last_name="Patient",
+            date_of_birth=date(1990, 1, 1),
+            email="patient@test.com",
+            phone="+254700000000",
+        )
+    yield patient
+    with django_db_blocker.unblock():
+        patient.delete()
+
+
+@pytest.fixture(scope="module")
+def test_service(django_db_setup, django_db_blocker):
+    """Create a test service once for the module."""
+    with django_db_blocker.unblock():
+        service = Service.objects.create(
+            code="LAB001",
+            name="Complete Blood Count",
+            description="Full blood count test",
+            category=ServiceCategory.LABORATORY,
+            unit_price=Decimal("500.00"),
+        )
+    yield service
+    with django_db_blocker.unblock():
+        service.delete()
 
 
 @pytest.fixture
@@ -76,11 +84,22 @@ class TestServiceEndpoints:
 
     def test_list_services(self, authenticated_admin_client, test_service):
         """Test listing services."""
+        Service.objects.create(code="LAB002", name="Urinalysis", unit_price=Decimal("300.00"))
         url = reverse("service-list")
-        response = authenticated_admin_client.get(url)
+        response = authenticated_admin_client.get(url, {"page_size": 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 1
+
+    def test_list_services_page_size(self, authenticated_admin_client, test_service):
+        """Test that page_size limits the page and leaves a cursor to the rest."""
+        Service.objects.create(code="LAB002", name="Urinalysis", unit_price=Decimal("300.00"))
+        url = reverse("service-list")
+        response = authenticated_admin_client.get(url, {"page_size": 1})
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) >= 1
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is not None
 
     def test_create_service(self, authenticated_admin_client):
         """Test creating a service."""
@@ -111,13 +130,18 @@ class TestServiceEndpoints:
 class TestInvoiceEndpoints:
     """Tests for invoice operations."""
 
-    def test_list_invoices(self, authenticated_admin_client, test_invoice):
+    def test_list_invoices(
+        self, authenticated_admin_client, test_invoice, test_patient, admin_user, django_assert_max_num_queries
+    ):
         """Test listing invoices."""
+        # A second invoice, so page_size has something to cut
+        Invoice.objects.create(patient=test_patient, due_date=date.today() + timedelta(days=30), created_by=admin_user)
         url = reverse("invoice-list")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(4):
+            response = authenticated_admin_client.get(url, {"page_size": 1})
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) >= 1
+        assert len(response.data["results"]) == 1
 
     def test_create_invoice(self, authenticated_admin_client, test_patient, test_service):
         """Test creating an invoice with items."""
@@ -151,9 +175,7 @@ class TestInvoiceEndpoints:
     def test_cancel_invoice(self, authenticated_admin_client, test_invoice):
         """Test cancelling an invoice."""
         # Ensure invoice is in PENDING status
-        test_invoice.status = InvoiceStatus.PENDING
-        test_invoice.save()
-        test_invoice.refresh_from_db()
+        Invoice.objects.filter(pk=test_invoice.pk).update(status=InvoiceStatus.PENDING)
 
         url = reverse("invoice-cancel", kwargs={"pk": test_invoice.id})
         response = authenticated_admin_client.post(url)
@@ -176,18 +198,15 @@ class TestInvoiceEndpoints:
 
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-    def test_get_invoice_payments(self, authenticated_admin_client, test_invoice):
+    def test_get_invoice_payments(
+        self, authenticated_admin_client, test_invoice, make_payment, django_assert_max_num_queries
+    ):
         """Test getting payments for an invoice."""
-        # Create a payment
-        Payment.objects.create(
-            invoice=test_invoice,
-            payment_method=PaymentMethod.CASH,
-            amount=Decimal("100.00"),
-            status=PaymentStatus.COMPLETED,
-        )
+        make_payment(test_invoice)
 
         url = reverse("invoice-payments", kwargs={"pk": test_invoice.id})
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(4):
+            response = authenticated_admin_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) == 1
@@ -196,72 +215,69 @@ class TestInvoiceEndpoints:
 class TestPaymentEndpoints:
     """Tests for payment operations."""
 
-    def test_list_payments(self, authenticated_admin_client, test_invoice):
-        """Test listing payments."""
-        Payment.objects.create(
-            invoice=test_invoice,
-            payment_method=PaymentMethod.MPESA,
-            amount=Decimal("500.00"),
-            status=PaymentStatus.COMPLETED,
-        )
+    def test_list_payments(self, authenticated_admin_client, test_invoice, payments_factory):
+        """Test listing payments across cursor pages."""
+        payments_factory(test_invoice, 10, payment_method=PaymentMethod.MPESA, amount=Decimal("50.00"))
 
         url = reverse("payment-list")
-        response = authenticated_admin_client.get(url)
+        response = authenticated_admin_client.get(url, {"page_size": 5})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 5
+        assert response.data["next"] is not None
+
+        response = authenticated_admin_client.get(response.data["next"])
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) >= 1
+        assert len(response.data["results"]) == 5
+        assert response.data["next"] is None
 
 
 class TestMpesaIntegration:
     """Tests for M-Pesa integration."""
 
-    @patch("apps.billing.views.MpesaService")
-    def test_stk_push_initiation(self, mock_mpesa_class, authenticated_admin_client, test_invoice):
-        """Test initiating STK Push payment."""
+    @pytest.mark.parametrize(
+        "payload,expected_status",
+        [
+            ({"phone_number": "0700000000", "amount": "500.00"}, status.HTTP_200_OK),
+            ({}, status.HTTP_400_BAD_REQUEST),  # missing phone number and amount
+        ],
+        ids=["initiation", "validation"],
+    )
+    def test_stk_push(self, authenticated_admin_client, test_invoice, mocked_requests, payload, expected_status):
+        """Test initiating STK Push payment and its validation errors."""
         # Ensure invoice is in payable state
-        test_invoice.status = InvoiceStatus.PENDING
-        test_invoice.save()
-        test_invoice.refresh_from_db()
-
-        mock_mpesa = MagicMock()
-        mock_mpesa.initiate_stk_push.return_value = {
-            "success": True,
-            "merchant_request_id": "12345",
-            "checkout_request_id": "67890",
-            "response_code": "0",
-            "response_description": "Success",
-            "customer_message": "Enter PIN",
-        }
-        mock_mpesa_class.return_value = mock_mpesa
+        Invoice.objects.filter(pk=test_invoice.pk).update(status=InvoiceStatus.PENDING)
+
+        # Mock Daraja at the HTTP boundary so the real MpesaService code runs
+        config = MpesaConfig()
+        mocked_requests.get(config.oauth_url, json={"access_token": "test-token", "expires_in": "3599"})
+        mocked_requests.post(
+            config.stk_push_url,
+            json={
+                "MerchantRequestID": "12345",
+                "CheckoutRequestID": "67890",
+                "ResponseCode": "0",
+                "ResponseDescription": "Success",
+                "CustomerMessage": "Enter PIN",
+            },
+        )
 
         url = reverse("mpesa-stk-push")
-        data = {
-            "invoice_id": str(test_invoice.id),
-            "phone_number": "0700000000",
-            "amount": "500.00",
-        }
+        data = {"invoice_id": str(test_invoice.id), **payload}
         response = authenticated_admin_client.post(url, data, format="json")
 
-        assert response.status_code == status.HTTP_200_OK
-        assert response.data["success"] is True
-        assert "payment_id" in response.data
-
-    def test_stk_push_validation(self, authenticated_admin_client, test_invoice):
-        """Test STK Push validation errors."""
-        url = reverse("mpesa-stk-push")
-
-        # Test missing phone number
-        data = {
-            "invoice_id": str(test_invoice.id),
-        }
-        response = authenticated_admin_client.post(url, data, format="json")
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == expected_status
+        if expected_status == status.HTTP_200_OK:
+            assert response.data["success"] is True
+            assert "payment_id" in response.data
+            assert response.data["checkout_request_id"] == "67890"
 
-    def test_mpesa_callback_success(self, api_client, test_invoice):
+    def test_mpesa_callback_success(self, api_client, test_invoice, make_payment):
         """Test successful M-Pesa callback."""
         # Create a pending payment
-        payment = Payment.objects.create(
-            invoice=test_invoice,
+        payment = make_payment(
+            test_invoice,
             payment_method=PaymentMethod.MPESA,
             amount=Decimal("500.00"),
             phone_number="254700000000",
@@ -271,37 +287,19 @@ class TestMpesaIntegration:
         )
 
         url = reverse("mpesa-callback")
-        callback_data = {
-            "Body": {
-                "stkCallback": {
-                    "MerchantRequestID": "12345",
-                    "CheckoutRequestID": "67890",
-                    "ResultCode": 0,
-                    "ResultDesc": "Success",
-                    "CallbackMetadata": {
-                        "Item": [
-                            {"Name": "Amount", "Value": 500},
-                            {"Name": "MpesaReceiptNumber", "Value": "ABC123XYZ"},
-                            {"Name": "TransactionDate", "Value": 20240115123456},
-                            {"Name": "PhoneNumber", "Value": 254700000000},
-                        ]
-                    },
-                }
-            }
-        }
-        response = api_client.post(url, callback_data, format="json")
+        response = api_client.post(url, SUCCESS_CALLBACK, format="json")
 
         assert response.status_code == status.HTTP_200_OK
 
-        # Verify payment was updated
-        payment.refresh_from_db()
+        # The callback only acknowledges receipt, so check the stored payment
+        payment.refresh_from_db(fields=["status", "mpesa_receipt_number"])
         assert payment.status == PaymentStatus.COMPLETED
         assert payment.mpesa_receipt_number == "ABC123XYZ"
 
-    def test_mpesa_callback_failure(self, api_client, test_invoice):
+    def test_mpesa_callback_failure(self, api_client, test_invoice, make_payment):
         """Test failed M-Pesa callback."""
-        payment = Payment.objects.create(
-            invoice=test_invoice,
+        payment = make_payment(
+            test_invoice,
             payment_method=PaymentMethod.MPESA,
             amount=Decimal("500.00"),
             phone_number="254700000000",
@@ -310,21 +308,11 @@ class TestMpesaIntegration:
         )
 
         url = reverse("mpesa-callback")
-        callback_data = {
-            "Body": {
-                "stkCallback": {
-                    "MerchantRequestID": "12345",
-                    "CheckoutRequestID": "67890",
-                    "ResultCode": 1032,
-                    "ResultDesc": "Request cancelled by user",
-                }
-            }
-        }
-        response = api_client.post(url, callback_data, format="json")
+        response = api_client.post(url, FAILURE_CALLBACK, format="json")
 
         assert response.status_code == status.HTTP_200_OK
 
-        payment.refresh_from_db()
+        payment.refresh_from_db(fields=["status"])
         assert payment.status == PaymentStatus.FAILED
 
 
@@ -344,72 +332,33 @@ class TestInvoiceModel:
 
     def test_invoice_recalculation(self, db, test_invoice, test_service):
         """Test invoice total recalculation."""
-        # Add another item
-        InvoiceItem.objects.create(
+        # Add another item; bulk_create skips the post_save recalculation, so total_price is set here
+        InvoiceItem.objects.bulk_create(
+            [
+                InvoiceItem(
+                    invoice=test_invoice,
+                    service=test_service,
+                    quantity=2,
+                    unit_price=Decimal("500.00"),
+                    total_price=Decimal("1000.00"),
+                )
+            ]
+        )
+        test_invoice.recalculate()
+
+        assert test_invoice.subtotal == Decimal("1500.00")
+        assert test_invoice.total_amount == Decimal("1500.00")
+
+    def test_invoice_item_save_updates_invoice(self, db, test_invoice, test_service):
+        """Test InvoiceItem.save() prices the item and the post_save signal recalculates the invoice."""
+        item = InvoiceItem.objects.create(
             invoice=test_invoice,
             service=test_service,
             quantity=2,
             unit_price=Decimal("500.00"),
         )
-        test_invoice.recalculate()
 
+        assert item.total_price == Decimal("1000.00")
+        test_invoice.refresh_from_db()
         assert test_invoice.subtotal == Decimal("1500.00")
         assert test_invoice.total_amount == Decimal("1500.00")
-
-
-class TestMpesaService:
-    """Tests for MpesaService class."""
-
-    def test_phone_number_formatting(self):
-        """Test phone number formatting."""
-        service = MpesaService()
-
-        assert service._format_phone_number("0700000000") == "254700000000"
-        assert service._format_phone_number("+254700000000") == "254700000000"
-        assert service._format_phone_number("254700000000") == "254700000000"
-        assert service._format_phone_number("700000000") == "254700000000"
-
-    def test_callback_parsing_success(self):
-        """Test parsing successful callback data."""
-        callback_data = {
-            "Body": {
-                "stkCallback": {
-                    "MerchantRequestID": "12345",
-                    "CheckoutRequestID": "67890",
-                    "ResultCode": 0,
-                    "ResultDesc": "Success",
-                    "CallbackMetadata": {
-                        "Item": [
-                            {"Name": "Amount", "Value": 500},
-                            {"Name": "MpesaReceiptNumber", "Value": "ABC123"},
-                            {"Name": "TransactionDate", "Value": 20240115123456},
-                            {"Name": "PhoneNumber", "Value": 254700000000},
-                        ]
-                    },
-                }
-            }
-        }
-
-        result = MpesaService.parse_callback(callback_data)
-
-        assert result["success"] is True
-        assert result["amount"] == 500
-        assert result["receipt_number"] == "ABC123"
-
-    def test_callback_parsing_failure(self):
-        """Test parsing failed callback data."""
-        callback_data = {
-            "Body": {
-                "stkCallback": {
-                    "MerchantRequestID": "12345",
-                    "CheckoutRequestID": "67890",
-                    "ResultCode": 1032,
-                    "ResultDesc": "Request cancelled by user",
-                }
-            }
-        }
-
-        result = MpesaService.parse_callback(callback_data)
-
-        assert result["success"] is False
-        assert result["result_code"] == "1032"
@@ -23,41 +23,53 @@ from apps.lab_orders.models import (
 from apps.patients.models import Patient
 
 
-@pytest.fixture
-def test_type(db):
-    """Create a sample test type."""
-    return TestType.objects.create(
-        code="CBC",
-        name="Complete Blood Count",
-        description="Measures various blood components",
-        category=TestCategory.HEMATOLOGY,
-        loinc_code="58410-2",
-        specimen_type="Blood",
-        turnaround_hours=4,
-    )
-
-
-@pytest.fixture
-def test_type_chemistry(db):
-    """Create a chemistry test type."""
-    return TestType.objects.create(
-        code="BMP",
-        name="Basic Metabolic Panel",
-        description="Measures electrolytes and kidney function",
-        category=TestCategory.CHEMISTRY,
-        specimen_type="Blood",
-        turnaround_hours=2,
-    )
-
-
-@pytest.fixture
-def sample_patient(db):
-    """Create a sample patient for lab orders."""
-    return Patient.objects.create(
-        first_name="Lab",
-        last_name="Patient",
-        date_of_birth=date(1985, 6, 15),
-    )
+@pytest.fixture(scope="module")
+def test_type(django_db_setup, django_db_blocker):
+    """Create a sample test type once for the module."""
+    with django_db_blocker.unblock():
+        test_type = TestType.objects.create(
+            code="CBC",
+            name="Complete Blood Count",
+            description="Measures various blood components",
+            category=TestCategory.HEMATOLOGY,
+            loinc_code="58410-2",
+            specimen_type="Blood",
+            turnaround_hours=4,
+        )
+    yield test_type
+    with django_db_blocker.unblock():
+        test_type.delete()
+
+
+@pytest.fixture(scope="module")
+def test_type_chemistry(django_db_setup, django_db_blocker):
+    """Create a chemistry test type once for the module."""
+    with django_db_blocker.unblock():
+        test_type = TestType.objects.create(
+            code="BMP",
+            name="Basic Metabolic Panel",
+            description="Measures electrolytes and kidney function",
+            category=TestCategory.CHEMISTRY,
+            specimen_type="Blood",
+            turnaround_hours=2,
+        )
+    yield test_type
+    with django_db_blocker.unblock():
+        test_type.delete()
+
+
+@pytest.fixture(scope="module")
+def sample_patient(django_db_setup, django_db_blocker):
+    """Create a sample patient for lab orders once for the module."""
+    with django_db_blocker.unblock():
+        patient = Patient.objects.create(
+            first_name="Lab",
+            last_name="Patient",
+            date_of_birth=date(1985, 6, 15),
+        )
+    yield patient
+    with django_db_blocker.unblock():
+        patient.delete()
 
 
 @pytest.fixture
@@ -211,16 +223,44 @@ OBX|3|NM|HGB^Hemoglobin||14.5|g/dL|12.0-17.5|N"""
         assert parsed[0]["units"] == "10*3/uL"
         assert parsed[1]["identifier"] == "RBC^Red Blood Cell Count"
 
+    def test_parse_obx_values_large(self):
+        """Test parsing a large OBX blob, including short and over-long segments."""
+        lines = [f"OBX|{i}|NM|GLU^Glucose||{i}.0|mg/dL|70-99|H|||F|||20250115" for i in range(1, 1001)]
+        lines.insert(500, "OBX|1001|ST|NOTE||see report")  # no units/range/flag fields
+        lines.insert(10, "OBX|too|short")  # fewer than 6 fields, skipped
+        result = LabResult(hl7_obx_segments="\n".join(lines))
+
+        parsed = result.parse_obx_values()
+        assert len(parsed) == 1001
+        assert parsed[0] == {
+            "set_id": "1",
+            "value_type": "NM",
+            "identifier": "GLU^Glucose",
+            "value": "1.0",
+            "units": "mg/dL",
+            "reference_range": "70-99",
+            "abnormal_flag": "H",
+        }
+        assert parsed[500]["value"] == "see report"
+        assert parsed[500]["units"] == parsed[500]["abnormal_flag"] == ""
+        assert parsed[-1]["value"] == "1000.0"
+
 
 @pytest.mark.django_db
 class TestLabOrderAPI:
     """Tests for lab order API endpoints."""
 
-    def test_list_orders(self, authenticated_doctor_client, lab_order):
+    def test_list_orders(self, authenticated_doctor_client, lab_order, django_assert_max_num_queries):
         """Test listing lab orders."""
-        response = authenticated_doctor_client.get("/api/v1/lab/orders/")
+        # A second order, so page_size has something to cut
+        LabOrder.objects.create(
+            patient=lab_order.patient, ordering_provider=lab_order.ordering_provider, test_type=lab_order.test_type
+        )
+        with django_assert_max_num_queries(4):
+            response = authenticated_doctor_client.get("/api/v1/lab/orders/", {"page_size": 1})
 
         assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == 1
 
     def test_create_order(self, authenticated_doctor_client, sample_patient, test_type):
         """Test creating a lab order."""
@@ -253,16 +293,14 @@ class TestLabOrderAPI:
         response = authenticated_nurse_client.post(f"/api/v1/lab/orders/{lab_order.id}/collect_specimen/")
 
         assert response.status_code == status.HTTP_200_OK
-        lab_order.refresh_from_db()
-        assert lab_order.status == OrderStatus.COLLECTED
+        assert response.data["status"] == OrderStatus.COLLECTED
 
     def test_cancel_order(self, authenticated_doctor_client, lab_order):
         """Test cancelling an order."""
         response = authenticated_doctor_client.post(f"/api/v1/lab/orders/{lab_order.id}/cancel/")
 
         assert response.status_code == status.HTTP_200_OK
-        lab_order.refresh_from_db()
-        assert lab_order.status == OrderStatus.CANCELLED
+        assert response.data["status"] == OrderStatus.CANCELLED
 
     def test_pending_results_endpoint(self, authenticated_lab_tech_client, lab_order):
         """Test pending results endpoint for lab techs."""
@@ -295,7 +333,7 @@ class TestLabResultAPI:
         assert response.status_code == status.HTTP_201_CREATED
 
         # Order should be updated to RESULTED
-        lab_order.refresh_from_db()
+        lab_order.refresh_from_db(fields=["status"])
         assert lab_order.status == OrderStatus.RESULTED
 
     def test_doctor_cannot_create_result(self, authenticated_doctor_client, lab_order):
@@ -321,8 +359,7 @@ class TestLabResultAPI:
             result_summary="Normal",
             resulted_by=lab_tech_user,
         )
-        lab_order.status = OrderStatus.RESULTED
-        lab_order.save()
+        LabOrder.objects.filter(pk=lab_order.pk).update(status=OrderStatus.RESULTED)
 
         response = authenticated_doctor_client.post(
             f"/api/v1/lab/results/{result.id}/review/",
@@ -332,26 +369,28 @@ class TestLabResultAPI:
 
         assert response.status_code == status.HTTP_200_OK
 
-        result.refresh_from_db()
-        assert result.reviewed_by is not None
-        assert result.review_notes == "Results reviewed, no action needed"
+        assert response.data["reviewed_by"] is not None
+        assert response.data["review_notes"] == "Results reviewed, no action needed"
 
-        lab_order.refresh_from_db()
+        lab_order.refresh_from_db(fields=["status"])
         assert lab_order.status == OrderStatus.REVIEWED
 
-    def test_critical_results_endpoint(self, authenticated_doctor_client, lab_order, lab_tech_user):
+    def test_critical_results_endpoint(
+        self, authenticated_doctor_client, lab_order, lab_tech_user, django_assert_max_num_queries
+    ):
         """Test critical results endpoint."""
         lab_order.transition_to(OrderStatus.COLLECTED)
 
         LabResult.objects.create(
             order=lab_order,
-            hl7_obx_segments="OBX|1|NM|K||6.5|mmol/L|3.5-5.0|H",
+            hl7_obx_segments="OBX|1|NM|K^Potassium||6.5|mmol/L|3.5-5.0|H",
             result_summary="CRITICAL: Potassium elevated",
             is_critical=True,
             resulted_by=lab_tech_user,
         )
 
-        response = authenticated_doctor_client.get("/api/v1/lab/results/critical/")
+        with django_assert_max_num_queries(4):
+            response = authenticated_doctor_client.get("/api/v1/lab/results/critical/")
 
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data) >= 1
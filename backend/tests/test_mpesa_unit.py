@@ -0,0 +1,38 @@
+"""
+Unit tests for MpesaService helpers that need no database.
+
+Copyright (c) 2025, Immanuel Njogu. All rights reserved.
+"""
+
+import pytest
+
+from apps.billing.mpesa import MpesaService
+
+from .mpesa_payloads import FAILURE_CALLBACK, SUCCESS_CALLBACK
+
+
+class TestMpesaService:
+    """Tests for MpesaService class."""
+
+    def test_phone_number_formatting(self):
+        """Test phone number formatting."""
+        service = MpesaService()
+
+        assert service._format_phone_number("0700000000") == "254700000000"
+        assert service._format_phone_number("+254700000000") == "254700000000"
+        assert service._format_phone_number("254700000000") == "254700000000"
+        assert service._format_phone_number("700000000") == "254700000000"
+
+    @pytest.mark.parametrize(
+        "callback,expected",
+        [
+            (SUCCESS_CALLBACK, {"success": True, "amount": 500, "receipt_number": "ABC123XYZ"}),
+            (FAILURE_CALLBACK, {"success": False, "result_code": "1032"}),
+        ],
+        ids=["success", "failure"],
+    )
+    def test_callback_parsing(self, callback, expected):
+        """Test parsing successful and failed callback data."""
+        result = MpesaService.parse_callback(callback)
+
+        assert {key: result[key] for key in expected} == expected
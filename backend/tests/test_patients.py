@@ -6,7 +6,10 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 
 from datetime import date
 
+from django.apps import apps
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
 
 import pytest
 
@@ -14,33 +17,54 @@ from apps.patients.models import BloodType, Gender, Patient
 
 
 # Set a test encryption key
-@pytest.fixture(autouse=True)
-def set_encryption_key(settings):
-    """Set PII encryption key for tests."""
-    settings.HOSPITAL_SETTINGS = {
-        "ENABLE_C_MODULES": False,
-        "PII_ENCRYPTION_KEY": "test-encryption-key-for-pytest-12345",
+@pytest.fixture(scope="module", autouse=True)
+def set_encryption_key():
+    """Set PII encryption key for tests, before the module's shared patient is encrypted."""
+    with override_settings(
+        HOSPITAL_SETTINGS={
+            "ENABLE_C_MODULES": False,
+            "PII_ENCRYPTION_KEY": "test-encryption-key-for-pytest-12345",
+        }
+    ):
+        yield
+
+
+def _build_patient(**overrides):
+    """Return an unsaved patient with John Doe's details."""
+    fields = {
+        "first_name": "John",
+        "last_name": "Doe",
+        "middle_name": "William",
+        "date_of_birth": date(1980, 5, 15),
+        "gender": Gender.MALE,
+        "phone": "+15551234567",
+        "email": "johndoe@example.com",
+        "address_line1": "123 Main St",
+        "city": "Springfield",
+        "state": "IL",
+        "postal_code": "62701",
+        "blood_type": BloodType.A_POS,
+        **overrides,
     }
+    return Patient(**fields)
 
 
-@pytest.fixture
-def sample_patient(db):
-    """Create a sample patient."""
-    patient = Patient(
-        first_name="John",
-        last_name="Doe",
-        middle_name="William",
-        date_of_birth=date(1980, 5, 15),
-        gender=Gender.MALE,
-        phone="+15551234567",
-        email="johndoe@example.com",
-        address_line1="123 Main St",
-        city="Springfield",
-        state="IL",
-        postal_code="62701",
-        blood_type=BloodType.A_POS,
-    )
+@pytest.fixture(scope="module")
+def sample_patient(django_db_setup, django_db_blocker):
+    """Create a sample patient once for the module; tests must only read it."""
+    patient = _build_patient()
     patient.set_ssn("123-45-6789")
+    with django_db_blocker.unblock():
+        patient.save()
+    yield patient
+    with django_db_blocker.unblock():
+        patient.delete()
+
+
+@pytest.fixture
+def mutable_patient(db):
+    """Create a patient for tests that change it (no SSN, so SSN lookups still find sample_patient)."""
+    patient = _build_patient(first_name="Jack")
     patient.save()
     return patient
 
@@ -73,13 +97,40 @@ class TestPatientModel:
         assert decrypted == "123456789"  # without dashes
 
         # Verify it's stored encrypted (not plain text)
-        assert sample_patient._ssn_encrypted is not None
-        assert b"123456789" not in bytes(sample_patient._ssn_encrypted)
+        # set_ssn stores bytes on the instance, so search it in place (a DB-loaded memoryview would need bytes())
+        assert isinstance(sample_patient._ssn_encrypted, bytes)
+        assert b"123456789" not in sample_patient._ssn_encrypted
 
     def test_ssn_masked(self, sample_patient):
         """Test masked SSN display."""
         assert sample_patient.ssn_masked == "XXX-XX-6789"
 
+    def test_ssn_masked_follows_set_ssn(self):
+        """Test the cached mask is recomputed when the SSN changes."""
+        patient = _build_patient()
+        patient.set_ssn("123-45-6789")
+        assert patient.ssn_masked == "XXX-XX-6789"
+
+        patient.set_ssn("987-65-4321")
+        assert patient.ssn_masked == "XXX-XX-4321"
+
+        patient.set_ssn("")
+        assert patient.ssn_masked is None
+
+    def test_ssn_masked_follows_refresh_from_db(self, mutable_patient):
+        """Test the cached mask is recomputed after the SSN changes in the database."""
+        mutable_patient.set_ssn("111-22-3333")
+        mutable_patient.save()
+        assert mutable_patient.ssn_masked == "XXX-XX-3333"
+
+        # Another instance changes the stored SSN
+        other = Patient.objects.get(pk=mutable_patient.pk)
+        other.set_ssn("444-55-6666")
+        other.save()
+
+        mutable_patient.refresh_from_db()
+        assert mutable_patient.ssn_masked == "XXX-XX-6666"
+
     def test_find_by_ssn(self, sample_patient):
         """Test finding patient by SSN."""
         # Find with dashes
@@ -154,15 +205,22 @@ class TestPatientAPI:
         assert "ssn_masked" in response.data
         assert response.data["ssn_masked"] == "XXX-XX-6789"
 
-    def test_update_patient(self, authenticated_doctor_client, sample_patient):
+    def test_update_patient(self, authenticated_doctor_client, mutable_patient):
         """Test updating a patient."""
         response = authenticated_doctor_client.patch(
-            f"/api/v1/patients/{sample_patient.id}/", {"phone": "+15559999999"}, format="json"
+            f"/api/v1/patients/{mutable_patient.id}/", {"phone": "+15559999999"}, format="json"
         )
 
         assert response.status_code == 200
-        sample_patient.refresh_from_db()
-        assert sample_patient.phone == "+15559999999"
+        assert response.data["phone"] == "+15559999999"
+
+    def test_update_patient_rejects_invalid_phone(self, authenticated_doctor_client, mutable_patient):
+        """Test the phone validator rejects malformed numbers."""
+        response = authenticated_doctor_client.patch(
+            f"/api/v1/patients/{mutable_patient.id}/", {"phone": "555-CALL-NOW"}, format="json"
+        )
+
+        assert response.status_code == 400
 
     def test_search_patients(self, authenticated_doctor_client, sample_patient):
         """Test searching patients."""
@@ -179,19 +237,19 @@ class TestPatientAPI:
         assert response.data["mrn"] == sample_patient.mrn
 
     def test_deactivate_patient_admin_only(
-        self, authenticated_admin_client, authenticated_doctor_client, sample_patient
+        self, authenticated_admin_client, authenticated_doctor_client, mutable_patient
     ):
         """Test only admins can deactivate patients."""
         # Doctor cannot deactivate
-        doctor_response = authenticated_doctor_client.delete(f"/api/v1/patients/{sample_patient.id}/")
+        doctor_response = authenticated_doctor_client.delete(f"/api/v1/patients/{mutable_patient.id}/")
         assert doctor_response.status_code == 403
 
         # Admin can deactivate
-        admin_response = authenticated_admin_client.delete(f"/api/v1/patients/{sample_patient.id}/")
+        admin_response = authenticated_admin_client.delete(f"/api/v1/patients/{mutable_patient.id}/")
         assert admin_response.status_code == 200
 
-        sample_patient.refresh_from_db()
-        assert not sample_patient.is_active
+        mutable_patient.refresh_from_db(fields=["is_active"])
+        assert not mutable_patient.is_active
 
     def test_duplicate_ssn_rejected(self, authenticated_doctor_client, sample_patient):
         """Test that duplicate SSN is rejected."""
@@ -236,3 +294,20 @@ class TestPatientPermissions:
         """Test lab techs can view patients."""
         response = authenticated_lab_tech_client.get("/api/v1/patients/")
         assert response.status_code == 200
+
+
+class TestEncryptionKeyCheck:
+    """Tests for the startup PII encryption key check."""
+
+    def test_missing_key_rejected_when_required(self, settings):
+        """Test CoreConfig.ready() refuses to start without a required key."""
+        settings.HOSPITAL_SETTINGS = {"REQUIRE_PII_ENCRYPTION_KEY": True, "PII_ENCRYPTION_KEY": None}
+
+        with pytest.raises(ImproperlyConfigured):
+            apps.get_app_config("core").ready()
+
+    def test_key_not_required_by_default(self, settings):
+        """Test the check is a no-op outside production."""
+        settings.HOSPITAL_SETTINGS = {"PII_ENCRYPTION_KEY": None}
+
+        apps.get_app_config("core").ready()
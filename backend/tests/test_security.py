@@ -5,6 +5,7 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 """
 
 from datetime import timedelta
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.core.cache import cache
@@ -18,65 +19,85 @@ import pytest
 
 from apps.security.middleware import get_client_ip
 from apps.security.models import BlockedIP, RateLimitViolation, RequestLog, SecurityEvent
+from apps.users.models import UserRole
 
 
-@pytest.fixture
-def blocked_ip(db, admin_user):
-    """Create a blocked IP."""
-    return BlockedIP.objects.create(
-        ip_address="192.168.1.100",
-        reason="Test block",
-        blocked_by=admin_user,
-    )
-
-
-@pytest.fixture
-def request_logs(db, admin_user):
-    """Create test request logs."""
-    logs = []
-    for i in range(5):
-        log = RequestLog.objects.create(
-            ip_address=f"192.168.1.{i}",
-            method="GET",
-            path=f"/api/v1/test/{i}/",
-            status_code=200,
-            response_time_ms=100 + i,
-            user=admin_user if i % 2 == 0 else None,
+@pytest.fixture(scope="module")
+def blocked_ip(django_db_setup, django_db_blocker, user_factory):
+    """Create a blocked IP once for the module."""
+    with django_db_blocker.unblock():
+        blocked = BlockedIP.objects.create(
+            ip_address="192.168.1.100",
+            reason="Test block",
+            blocked_by=user_factory(UserRole.ADMIN),
         )
-        logs.append(log)
-    return logs
-
-
-@pytest.fixture
-def security_events(db, admin_user):
-    """Create test security events."""
-    events = []
-    for event_type in [
-        SecurityEvent.EventType.LOGIN_SUCCESS,
-        SecurityEvent.EventType.LOGIN_FAILED,
-        SecurityEvent.EventType.IP_BLOCKED,
-    ]:
-        event = SecurityEvent.objects.create(
-            event_type=event_type,
-            description=f"Test {event_type}",
-            ip_address="192.168.1.1",
-            user=admin_user,
-            severity=SecurityEvent.Severity.MEDIUM,
+    yield blocked
+    with django_db_blocker.unblock():
+        blocked.delete()
+
+
+@pytest.fixture(scope="module")
+def request_logs(django_db_setup, django_db_blocker, user_factory):
+    """Create test request logs once for the module."""
+    admin_user = user_factory(UserRole.ADMIN)
+    with django_db_blocker.unblock():
+        logs = RequestLog.objects.bulk_create(
+            [
+                RequestLog(
+                    ip_address=f"192.168.1.{i}",
+                    method="GET",
+                    path=f"/api/v1/test/{i}/",
+                    status_code=200,
+                    response_time_ms=100 + i,
+                    user=admin_user if i % 2 == 0 else None,
+                )
+                for i in range(5)
+            ]
+        )
+    yield logs
+    with django_db_blocker.unblock():
+        RequestLog.objects.filter(pk__in=[log.pk for log in logs]).delete()
+
+
+@pytest.fixture(scope="module")
+def security_events(django_db_setup, django_db_blocker, user_factory):
+    """Create test security events once for the module."""
+    admin_user = user_factory(UserRole.ADMIN)
+    with django_db_blocker.unblock():
+        events = SecurityEvent.objects.bulk_create(
+            [
+                SecurityEvent(
+                    event_type=event_type,
+                    description=f"Test {event_type}",
+                    ip_address="192.168.1.1",
+                    user=admin_user,
+                    severity=SecurityEvent.Severity.MEDIUM,
+                )
+                for event_type in [
+                    SecurityEvent.EventType.LOGIN_SUCCESS,
+                    SecurityEvent.EventType.LOGIN_FAILED,
+                    SecurityEvent.EventType.IP_BLOCKED,
+                ]
+            ]
         )
-        events.append(event)
-    return events
+    yield events
+    with django_db_blocker.unblock():
+        SecurityEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
 
 
 class TestBlockedIPEndpoints:
     """Tests for blocked IP management."""
 
-    def test_list_blocked_ips(self, authenticated_admin_client, blocked_ip):
+    def test_list_blocked_ips(self, authenticated_admin_client, blocked_ip, admin_user, django_assert_max_num_queries):
         """Test listing blocked IPs."""
+        BlockedIP.objects.create(ip_address="10.0.0.99", reason="Second block", blocked_by=admin_user)
+
         url = reverse("blocked-ip-list")
-        response = authenticated_admin_client.get(url)
+        with django_assert_max_num_queries(3):
+            response = authenticated_admin_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["results"]) >= 1
+        assert len(response.data["results"]) >= 2
 
     def test_block_ip(self, authenticated_admin_client):
         """Test blocking an IP."""
@@ -154,9 +175,8 @@ class TestRequestLogEndpoints:
 
     def test_get_suspicious_logs(self, authenticated_admin_client, request_logs):
         """Test getting suspicious request logs."""
-        # Mark some logs as suspicious
-        request_logs[0].is_suspicious = True
-        request_logs[0].save()
+        # Mark some logs as suspicious (in the DB only; the module's log objects are shared)
+        RequestLog.objects.filter(pk=request_logs[0].pk).update(is_suspicious=True)
 
         url = reverse("request-log-suspicious")
         response = authenticated_admin_client.get(url)
@@ -231,7 +251,7 @@ class TestIPBlockingMiddleware:
     """Tests for IP blocking middleware."""
 
     @override_settings(SECURITY_SETTINGS={"ENABLE_IP_BLOCKING": True, "ENABLE_IP_TRACKING": False})
-    def test_blocked_ip_request_denied(self, client, blocked_ip):
+    def test_blocked_ip_request_denied(self, client, db, blocked_ip):
         """Test that blocked IP requests are denied."""
         # Clear cache to ensure fresh check
         cache.delete(f"blocked_ip:{blocked_ip.ip_address}")
@@ -253,26 +273,17 @@ class TestIPBlockingMiddleware:
 class TestGetClientIP:
     """Tests for client IP extraction."""
 
-    def test_get_ip_from_remote_addr(self):
-        """Test getting IP from REMOTE_ADDR."""
-
-        class MockRequest:
-            META = {"REMOTE_ADDR": "192.168.1.1"}
-
-        ip = get_client_ip(MockRequest())
-        assert ip == "192.168.1.1"
-
-    def test_get_ip_from_x_forwarded_for(self):
-        """Test getting IP from X-Forwarded-For header."""
-
-        class MockRequest:
-            META = {
-                "HTTP_X_FORWARDED_FOR": "10.0.0.1, 192.168.1.1",
-                "REMOTE_ADDR": "127.0.0.1",
-            }
-
-        ip = get_client_ip(MockRequest())
-        assert ip == "10.0.0.1"
+    @pytest.mark.parametrize(
+        "meta,expected",
+        [
+            ({"REMOTE_ADDR": "192.168.1.1"}, "192.168.1.1"),
+            ({"HTTP_X_FORWARDED_FOR": "10.0.0.1, 192.168.1.1", "REMOTE_ADDR": "127.0.0.1"}, "10.0.0.1"),
+        ],
+        ids=["remote_addr", "x_forwarded_for"],
+    )
+    def test_get_client_ip(self, meta, expected):
+        """Test getting IP from REMOTE_ADDR or the first X-Forwarded-For hop."""
+        assert get_client_ip(SimpleNamespace(META=meta)) == expected
 
 
 class TestBlockedIPModel:
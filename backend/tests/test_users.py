@@ -7,10 +7,13 @@ Copyright (c) 2025, Immanuel Njogu. All rights reserved.
 from django.urls import reverse
 
 from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
 
 import pytest
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 
 from apps.users.models import User, UserRole
+from apps.users.views import MeView
 
 
 @pytest.mark.django_db
@@ -51,37 +54,48 @@ class TestUserModel:
         user = User(first_name="John", last_name="Doe")
         assert user.full_name == "John Doe"
 
-    def test_role_checks(self):
+    @pytest.mark.parametrize(
+        "role,attr",
+        [
+            (UserRole.ADMIN, "is_admin"),
+            (UserRole.DOCTOR, "is_doctor"),
+            (UserRole.NURSE, "is_nurse"),
+            (UserRole.LAB_TECH, "is_lab_tech"),
+        ],
+    )
+    def test_role_checks(self, role, attr):
         """Test role check properties."""
-        admin = User(role=UserRole.ADMIN)
-        doctor = User(role=UserRole.DOCTOR)
-        nurse = User(role=UserRole.NURSE)
-        lab_tech = User(role=UserRole.LAB_TECH)
-
-        assert admin.is_admin
-        assert doctor.is_doctor
-        assert nurse.is_nurse
-        assert lab_tech.is_lab_tech
-
-        assert doctor.is_clinical_staff
-        assert nurse.is_clinical_staff
-        assert lab_tech.is_clinical_staff
-        assert not admin.is_clinical_staff
-
-    def test_can_order_labs(self):
+        assert getattr(User(role=role), attr)
+
+    @pytest.mark.parametrize(
+        "role,expected",
+        [
+            (UserRole.DOCTOR, True),
+            (UserRole.NURSE, True),
+            (UserRole.LAB_TECH, True),
+            (UserRole.ADMIN, False),
+        ],
+    )
+    def test_is_clinical_staff(self, role, expected):
+        """Test clinical staff property."""
+        assert User(role=role).is_clinical_staff is expected
+
+    @pytest.mark.parametrize(
+        "role,expected",
+        [
+            (UserRole.DOCTOR, True),
+            (UserRole.NURSE, True),
+            (UserRole.LAB_TECH, False),
+            (UserRole.RECEPTIONIST, False),
+        ],
+    )
+    def test_can_order_labs(self, role, expected):
         """Test lab ordering permission property."""
-        doctor = User(role=UserRole.DOCTOR)
-        nurse = User(role=UserRole.NURSE)
-        lab_tech = User(role=UserRole.LAB_TECH)
-        receptionist = User(role=UserRole.RECEPTIONIST)
-
-        assert doctor.can_order_labs
-        assert nurse.can_order_labs
-        assert not lab_tech.can_order_labs
-        assert not receptionist.can_order_labs
+        assert User(role=role).can_order_labs is expected
 
 
 @pytest.mark.django_db
+@pytest.mark.usefixtures("disable_security_signals")
 class TestAuthEndpoints:
     """Tests for authentication endpoints."""
 
@@ -105,9 +119,12 @@ class TestAuthEndpoints:
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    def test_me_endpoint(self, authenticated_admin_client, admin_user):
+    def test_me_endpoint(self, admin_user):
         """Test retrieving current user."""
-        response = authenticated_admin_client.get("/api/v1/auth/me/")
+        # Call the view directly; test_me_unauthenticated covers the URL and middleware
+        request = APIRequestFactory().get("/api/v1/auth/me/")
+        force_authenticate(request, user=admin_user)
+        response = MeView.as_view()(request)
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data["email"] == admin_user.email
@@ -119,19 +136,31 @@ class TestAuthEndpoints:
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    def test_logout(self, authenticated_admin_client, admin_user, api_client):
-        """Test logout (token blacklist)."""
-        # First login to get tokens
-        login_response = api_client.post(
-            "/api/v1/auth/login/", {"email": "admin@hospital.test", "password": "AdminPass123!"}, format="json"
+    def test_logout(self, authenticated_admin_client, admin_tokens):
+        """Test logout blacklists the refresh token."""
+        response = authenticated_admin_client.post(
+            "/api/v1/auth/logout/", {"refresh": admin_tokens["refresh"]}, format="json"
         )
-        refresh_token = login_response.data["refresh"]
-
-        # Logout
-        response = authenticated_admin_client.post("/api/v1/auth/logout/", {"refresh": refresh_token}, format="json")
 
         assert response.status_code == status.HTTP_205_RESET_CONTENT
 
+        # The logged-out refresh token can no longer be exchanged
+        response = authenticated_admin_client.post(
+            "/api/v1/auth/refresh/", {"refresh": admin_tokens["refresh"]}, format="json"
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_without_blacklist(self, authenticated_admin_client, admin_tokens, settings):
+        """Test logout refuses to report success when tokens cannot be revoked."""
+        settings.JWT_ENABLE_BLACKLIST = False
+
+        response = authenticated_admin_client.post(
+            "/api/v1/auth/logout/", {"refresh": admin_tokens["refresh"]}, format="json"
+        )
+
+        assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
+        assert not BlacklistedToken.objects.exists()
+
 
 @pytest.mark.django_db
 class TestUserViewSet:
@@ -166,7 +195,7 @@ class TestUserViewSet:
         response = authenticated_admin_client.delete(f"/api/v1/users/{doctor_user.id}/")
 
         assert response.status_code == status.HTTP_200_OK
-        doctor_user.refresh_from_db()
+        doctor_user.refresh_from_db(fields=["is_active"])
         assert not doctor_user.is_active
 
     def test_cannot_deactivate_self(self, authenticated_admin_client, admin_user):
@@ -72,6 +72,51 @@ int cutils_aes_gcm_decrypt(
     size_t *output_len
 );
 
+/**
+ * @brief AES-256-GCM context bound to one key
+ * 
+ * The key schedule is expanded once in cutils_aes_gcm_ctx_new, so each
+ * encrypt/decrypt only sets a fresh IV. Output format matches
+ * cutils_aes_gcm_encrypt/decrypt. A context must not be used by two
+ * threads at the same time.
+ */
+typedef struct cutils_aes_gcm_ctx cutils_aes_gcm_ctx;
+
+/**
+ * @brief Create an AES-256-GCM context for a 32-byte key
+ * 
+ * @param key 32-byte encryption key
+ * @return New context, or NULL on failure
+ */
+cutils_aes_gcm_ctx *cutils_aes_gcm_ctx_new(const uint8_t *key);
+
+/**
+ * @brief Free a context created by cutils_aes_gcm_ctx_new (NULL is ignored)
+ */
+void cutils_aes_gcm_ctx_free(cutils_aes_gcm_ctx *gcm);
+
+/**
+ * @brief Encrypt with a keyed context; see cutils_aes_gcm_encrypt
+ */
+int cutils_aes_gcm_ctx_encrypt(
+    cutils_aes_gcm_ctx *gcm,
+    const uint8_t *plaintext,
+    size_t plaintext_len,
+    uint8_t *output,
+    size_t *output_len
+);
+
+/**
+ * @brief Decrypt with a keyed context; see cutils_aes_gcm_decrypt
+ */
+int cutils_aes_gcm_ctx_decrypt(
+    cutils_aes_gcm_ctx *gcm,
+    const uint8_t *ciphertext,
+    size_t ciphertext_len,
+    uint8_t *output,
+    size_t *output_len
+);
+
 /**
  * @brief Compute SHA-256 hash
  * 
@@ -101,6 +146,15 @@ uint64_t cutils_xxh3(const uint8_t *data, size_t data_len);
  */
 int cutils_generate_token(uint8_t *output);
 
+/**
+ * @brief Generate several random tokens with a single CSPRNG call
+ * 
+ * @param output Output buffer (must be count * 32 bytes)
+ * @param count Number of tokens to generate
+ * @return CUTILS_SUCCESS on success, negative error code on failure
+ */
+int cutils_generate_tokens(uint8_t *output, size_t count);
+
 /**
  * @brief Encode bytes as hexadecimal string
  * 
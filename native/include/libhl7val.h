@@ -55,6 +55,21 @@ int hl7val_validate_segment(const char *segment, size_t segment_len, char *error
  */
 int hl7val_extract_field(const char *segment, int field_num, char *output, size_t output_size);
 
+/**
+ * @brief Locate every field of an HL7 segment in a single pass
+ * 
+ * Field i + 1 (1-based, numbered as in hl7val_extract_field) spans
+ * lengths[i] bytes starting at segment + offsets[i]. Scanning stops after
+ * max_fields fields.
+ * 
+ * @param segment Null-terminated HL7 segment
+ * @param offsets Output array of field start offsets
+ * @param lengths Output array of field lengths
+ * @param max_fields Capacity of offsets and lengths
+ * @return Number of fields indexed (>= 0), negative error code on failure
+ */
+int hl7val_index_fields(const char *segment, size_t *offsets, size_t *lengths, int max_fields);
+
 /**
  * @brief Get error message for error code
  * 
@@ -1,24 +1,40 @@
 """Hospital Native C Extensions - Python wrappers"""
 
+import importlib
+
 __version__ = "0.1.0"
 
-try:
-    from . import _cutils, _hl7val
-    
-    # Re-export for convenience
-    aes_gcm_encrypt = _cutils.aes_gcm_encrypt
-    aes_gcm_decrypt = _cutils.aes_gcm_decrypt
-    sha256 = _cutils.sha256
-    generate_token = _cutils.generate_token
-    hex_encode = _cutils.hex_encode
-    
-    validate_hl7_segment = _hl7val.validate_segment
-    extract_hl7_field = _hl7val.extract_field
-    
-    # Note: _authz and _bill C extensions to be added in future
-    # For now, use the Django wrapper functions in apps.core.utils
-    
-except ImportError as e:
-    # Fallback message if C extensions not built
-    import warnings
-    warnings.warn(f"C extensions not available: {e}. Some features will be limited.")
+# Re-exports for convenience: public name -> (extension module, attribute).
+# Extensions are imported on first attribute access (PEP 562), so importing the
+# package costs nothing until a function is used; a missing build then raises
+# ImportError at that point instead of being swallowed at import time.
+_EXPORTS = {
+    "aes_gcm_encrypt": ("_cutils", "aes_gcm_encrypt"),
+    "aes_gcm_decrypt": ("_cutils", "aes_gcm_decrypt"),
+    "AesGcmCipher": ("_cutils", "AesGcmCipher"),
+    "sha256": ("_cutils", "sha256"),
+    "generate_token": ("_cutils", "generate_token"),
+    "generate_tokens": ("_cutils", "generate_tokens"),
+    "hex_encode": ("_cutils", "hex_encode"),
+    "validate_hl7_segment": ("_hl7val", "validate_segment"),
+    "extract_hl7_field": ("_hl7val", "extract_field"),
+    "extract_hl7_fields": ("_hl7val", "extract_fields"),
+}
+
+# Note: _authz and _bill C extensions to be added in future
+# For now, use the Django wrapper functions in apps.core.utils
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -2,6 +2,12 @@
 #include <Python.h>
 #include "libcutils.h"
 
+/*
+ * Below this many input bytes, hashing and hex encoding finish faster than
+ * releasing and re-acquiring the GIL costs (same cutoff as hashlib).
+ */
+#define CUTILS_GIL_MINSIZE 2048
+
 static PyObject* py_aes_gcm_encrypt(PyObject* self, PyObject* args) {
     Py_buffer plaintext_buf, key_buf;
     
@@ -16,16 +22,19 @@ static PyObject* py_aes_gcm_encrypt(PyObject* self, PyObject* args) {
         return NULL;
     }
     
+    /* Encrypt straight into the bytes object that is returned */
     size_t output_len = plaintext_buf.len + CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE;
-    uint8_t *output = PyMem_Malloc(output_len);
-    if (!output) {
+    PyObject *ret = PyBytes_FromStringAndSize(NULL, output_len);
+    if (!ret) {
         PyBuffer_Release(&plaintext_buf);
         PyBuffer_Release(&key_buf);
-        return PyErr_NoMemory();
+        return NULL;
     }
+    uint8_t *output = (uint8_t*)PyBytes_AS_STRING(ret);
     
+    int result;
     Py_BEGIN_ALLOW_THREADS
-    int result = cutils_aes_gcm_encrypt(
+    result = cutils_aes_gcm_encrypt(
         plaintext_buf.buf, plaintext_buf.len,
         key_buf.buf, output, &output_len
     );
@@ -35,13 +44,11 @@ static PyObject* py_aes_gcm_encrypt(PyObject* self, PyObject* args) {
     PyBuffer_Release(&key_buf);
     
     if (result != CUTILS_SUCCESS) {
-        PyMem_Free(output);
+        Py_DECREF(ret);
         PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
         return NULL;
     }
     
-    PyObject *ret = PyBytes_FromStringAndSize((char*)output, output_len);
-    PyMem_Free(output);
     return ret;
 }
 
@@ -59,16 +66,20 @@ static PyObject* py_aes_gcm_decrypt(PyObject* self, PyObject* args) {
         return NULL;
     }
     
-    size_t output_len = ciphertext_buf.len;
-    uint8_t *output = PyMem_Malloc(output_len);
-    if (!output) {
+    /* GCM has no padding, so the plaintext is exactly the ciphertext minus IV and tag */
+    Py_ssize_t overhead = CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE;
+    size_t output_len = ciphertext_buf.len > overhead ? ciphertext_buf.len - overhead : 0;
+    PyObject *ret = PyBytes_FromStringAndSize(NULL, output_len);
+    if (!ret) {
         PyBuffer_Release(&ciphertext_buf);
         PyBuffer_Release(&key_buf);
-        return PyErr_NoMemory();
+        return NULL;
     }
+    uint8_t *output = (uint8_t*)PyBytes_AS_STRING(ret);
     
+    int result;
     Py_BEGIN_ALLOW_THREADS
-    int result = cutils_aes_gcm_decrypt(
+    result = cutils_aes_gcm_decrypt(
         ciphertext_buf.buf, ciphertext_buf.len,
         key_buf.buf, output, &output_len
     );
@@ -78,13 +89,11 @@ static PyObject* py_aes_gcm_decrypt(PyObject* self, PyObject* args) {
     PyBuffer_Release(&key_buf);
     
     if (result != CUTILS_SUCCESS) {
-        PyMem_Free(output);
+        Py_DECREF(ret);
         PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
         return NULL;
     }
     
-    PyObject *ret = PyBytes_FromStringAndSize((char*)output, output_len);
-    PyMem_Free(output);
     return ret;
 }
 
@@ -97,9 +106,14 @@ static PyObject* py_sha256(PyObject* self, PyObject* args) {
     
     uint8_t output[CUTILS_SHA256_SIZE];
     
-    Py_BEGIN_ALLOW_THREADS
-    int result = cutils_sha256(data_buf.buf, data_buf.len, output);
-    Py_END_ALLOW_THREADS
+    int result;
+    if (data_buf.len >= CUTILS_GIL_MINSIZE) {
+        Py_BEGIN_ALLOW_THREADS
+        result = cutils_sha256(data_buf.buf, data_buf.len, output);
+        Py_END_ALLOW_THREADS
+    } else {
+        result = cutils_sha256(data_buf.buf, data_buf.len, output);
+    }
     
     PyBuffer_Release(&data_buf);
     
@@ -114,8 +128,9 @@ static PyObject* py_sha256(PyObject* self, PyObject* args) {
 static PyObject* py_generate_token(PyObject* self, PyObject* args) {
     uint8_t output[CUTILS_TOKEN_SIZE];
     
+    int result;
     Py_BEGIN_ALLOW_THREADS
-    int result = cutils_generate_token(output);
+    result = cutils_generate_token(output);
     Py_END_ALLOW_THREADS
     
     if (result != CUTILS_SUCCESS) {
@@ -126,6 +141,59 @@ static PyObject* py_generate_token(PyObject* self, PyObject* args) {
     return PyBytes_FromStringAndSize((char*)output, CUTILS_TOKEN_SIZE);
 }
 
+static PyObject* py_generate_tokens(PyObject* self, PyObject* args) {
+    Py_ssize_t count;
+    
+    if (!PyArg_ParseTuple(args, "n", &count)) {
+        return NULL;
+    }
+    
+    if (count < 0) {
+        PyErr_SetString(PyExc_ValueError, "Token count must be non-negative");
+        return NULL;
+    }
+    
+    if ((size_t)count > PY_SSIZE_T_MAX / CUTILS_TOKEN_SIZE) {
+        return PyErr_NoMemory();
+    }
+    
+    uint8_t *output = PyMem_Malloc(count * CUTILS_TOKEN_SIZE + 1);
+    if (!output) {
+        return PyErr_NoMemory();
+    }
+    
+    /* One CSPRNG call for the whole batch */
+    int result;
+    Py_BEGIN_ALLOW_THREADS
+    result = cutils_generate_tokens(output, count);
+    Py_END_ALLOW_THREADS
+    
+    if (result != CUTILS_SUCCESS) {
+        PyMem_Free(output);
+        PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
+        return NULL;
+    }
+    
+    PyObject *tokens = PyList_New(count);
+    if (!tokens) {
+        PyMem_Free(output);
+        return NULL;
+    }
+    
+    for (Py_ssize_t i = 0; i < count; i++) {
+        PyObject *token = PyBytes_FromStringAndSize((char*)output + i * CUTILS_TOKEN_SIZE, CUTILS_TOKEN_SIZE);
+        if (!token) {
+            Py_DECREF(tokens);
+            PyMem_Free(output);
+            return NULL;
+        }
+        PyList_SET_ITEM(tokens, i, token);
+    }
+    
+    PyMem_Free(output);
+    return tokens;
+}
+
 static PyObject* py_hex_encode(PyObject* self, PyObject* args) {
     Py_buffer data_buf;
     
@@ -133,31 +201,194 @@ static PyObject* py_hex_encode(PyObject* self, PyObject* args) {
         return NULL;
     }
     
-    char *output = PyMem_Malloc(data_buf.len * 2 + 1);
-    if (!output) {
+    if (data_buf.len == 0) {
+        PyBuffer_Release(&data_buf);
+        return PyUnicode_New(0, 127);
+    }
+    
+    if (data_buf.len > (PY_SSIZE_T_MAX - 1) / 2) {
         PyBuffer_Release(&data_buf);
         return PyErr_NoMemory();
     }
     
-    int result = cutils_hex_encode(data_buf.buf, data_buf.len, output);
+    /* Encode straight into an ASCII str; its buffer has room for the trailing NUL */
+    PyObject *ret = PyUnicode_New(data_buf.len * 2, 127);
+    if (!ret) {
+        PyBuffer_Release(&data_buf);
+        return NULL;
+    }
+    char *output = (char*)PyUnicode_1BYTE_DATA(ret);
+    
+    int result;
+    if (data_buf.len >= CUTILS_GIL_MINSIZE) {
+        Py_BEGIN_ALLOW_THREADS
+        result = cutils_hex_encode(data_buf.buf, data_buf.len, output);
+        Py_END_ALLOW_THREADS
+    } else {
+        result = cutils_hex_encode(data_buf.buf, data_buf.len, output);
+    }
     PyBuffer_Release(&data_buf);
     
     if (result != CUTILS_SUCCESS) {
-        PyMem_Free(output);
+        Py_DECREF(ret);
+        PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
+        return NULL;
+    }
+    
+    return ret;
+}
+
+/* AesGcmCipher: AES-256-GCM bound to one key, with the key schedule expanded once */
+
+typedef struct {
+    PyObject_HEAD
+    cutils_aes_gcm_ctx *gcm;
+    PyThread_type_lock lock;  /* serializes use of gcm while the GIL is released */
+} AesGcmCipherObject;
+
+static void cipher_acquire(AesGcmCipherObject *self) {
+    if (!PyThread_acquire_lock(self->lock, 0)) {
+        Py_BEGIN_ALLOW_THREADS
+        PyThread_acquire_lock(self->lock, 1);
+        Py_END_ALLOW_THREADS
+    }
+}
+
+static PyObject* AesGcmCipher_new(PyTypeObject *type, PyObject *args, PyObject *kwds) {
+    static char *kwlist[] = {"key", NULL};
+    Py_buffer key_buf;
+    
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "y*:AesGcmCipher", kwlist, &key_buf)) {
+        return NULL;
+    }
+    
+    if (key_buf.len != CUTILS_AES_KEY_SIZE) {
+        PyBuffer_Release(&key_buf);
+        PyErr_SetString(PyExc_ValueError, "Key must be 32 bytes");
+        return NULL;
+    }
+    
+    AesGcmCipherObject *self = (AesGcmCipherObject*)type->tp_alloc(type, 0);
+    if (!self) {
+        PyBuffer_Release(&key_buf);
+        return NULL;
+    }
+    
+    self->gcm = cutils_aes_gcm_ctx_new(key_buf.buf);
+    PyBuffer_Release(&key_buf);
+    if (!self->gcm) {
+        Py_DECREF(self);
+        PyErr_SetString(PyExc_RuntimeError, cutils_error_string(CUTILS_ERR_CRYPTO));
+        return NULL;
+    }
+    
+    self->lock = PyThread_allocate_lock();
+    if (!self->lock) {
+        Py_DECREF(self);
+        return PyErr_NoMemory();
+    }
+    
+    return (PyObject*)self;
+}
+
+static void AesGcmCipher_dealloc(AesGcmCipherObject *self) {
+    cutils_aes_gcm_ctx_free(self->gcm);
+    if (self->lock) {
+        PyThread_free_lock(self->lock);
+    }
+    Py_TYPE(self)->tp_free((PyObject*)self);
+}
+
+static PyObject* AesGcmCipher_encrypt(AesGcmCipherObject *self, PyObject *args) {
+    Py_buffer plaintext_buf;
+    
+    if (!PyArg_ParseTuple(args, "y*", &plaintext_buf)) {
+        return NULL;
+    }
+    
+    size_t output_len = plaintext_buf.len + CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE;
+    PyObject *ret = PyBytes_FromStringAndSize(NULL, output_len);
+    if (!ret) {
+        PyBuffer_Release(&plaintext_buf);
+        return NULL;
+    }
+    uint8_t *output = (uint8_t*)PyBytes_AS_STRING(ret);
+    
+    int result;
+    cipher_acquire(self);
+    Py_BEGIN_ALLOW_THREADS
+    result = cutils_aes_gcm_ctx_encrypt(self->gcm, plaintext_buf.buf, plaintext_buf.len, output, &output_len);
+    Py_END_ALLOW_THREADS
+    PyThread_release_lock(self->lock);
+    
+    PyBuffer_Release(&plaintext_buf);
+    
+    if (result != CUTILS_SUCCESS) {
+        Py_DECREF(ret);
         PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
         return NULL;
     }
     
-    PyObject *ret = PyUnicode_FromString(output);
-    PyMem_Free(output);
     return ret;
 }
 
+static PyObject* AesGcmCipher_decrypt(AesGcmCipherObject *self, PyObject *args) {
+    Py_buffer ciphertext_buf;
+    
+    if (!PyArg_ParseTuple(args, "y*", &ciphertext_buf)) {
+        return NULL;
+    }
+    
+    Py_ssize_t overhead = CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE;
+    size_t output_len = ciphertext_buf.len > overhead ? ciphertext_buf.len - overhead : 0;
+    PyObject *ret = PyBytes_FromStringAndSize(NULL, output_len);
+    if (!ret) {
+        PyBuffer_Release(&ciphertext_buf);
+        return NULL;
+    }
+    uint8_t *output = (uint8_t*)PyBytes_AS_STRING(ret);
+    
+    int result;
+    cipher_acquire(self);
+    Py_BEGIN_ALLOW_THREADS
+    result = cutils_aes_gcm_ctx_decrypt(self->gcm, ciphertext_buf.buf, ciphertext_buf.len, output, &output_len);
+    Py_END_ALLOW_THREADS
+    PyThread_release_lock(self->lock);
+    
+    PyBuffer_Release(&ciphertext_buf);
+    
+    if (result != CUTILS_SUCCESS) {
+        Py_DECREF(ret);
+        PyErr_SetString(PyExc_RuntimeError, cutils_error_string(result));
+        return NULL;
+    }
+    
+    return ret;
+}
+
+static PyMethodDef AesGcmCipherMethods[] = {
+    {"encrypt", (PyCFunction)AesGcmCipher_encrypt, METH_VARARGS, "Encrypt with AES-256-GCM"},
+    {"decrypt", (PyCFunction)AesGcmCipher_decrypt, METH_VARARGS, "Decrypt with AES-256-GCM"},
+    {NULL, NULL, 0, NULL}
+};
+
+static PyTypeObject AesGcmCipherType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "hospital_native._cutils.AesGcmCipher",
+    .tp_doc = "AES-256-GCM cipher bound to a 32-byte key",
+    .tp_basicsize = sizeof(AesGcmCipherObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = AesGcmCipher_new,
+    .tp_dealloc = (destructor)AesGcmCipher_dealloc,
+    .tp_methods = AesGcmCipherMethods,
+};
+
 static PyMethodDef CutilsMethods[] = {
     {"aes_gcm_encrypt", py_aes_gcm_encrypt, METH_VARARGS, "Encrypt with AES-256-GCM"},
     {"aes_gcm_decrypt", py_aes_gcm_decrypt, METH_VARARGS, "Decrypt with AES-256-GCM"},
     {"sha256", py_sha256, METH_VARARGS, "Compute SHA-256 hash"},
     {"generate_token", py_generate_token, METH_NOARGS, "Generate random token"},
+    {"generate_tokens", py_generate_tokens, METH_VARARGS, "Generate a list of random tokens"},
     {"hex_encode", py_hex_encode, METH_VARARGS, "Encode bytes as hex"},
     {NULL, NULL, 0, NULL}
 };
@@ -171,5 +402,15 @@ static struct PyModuleDef cutilsmodule = {
 };
 
 PyMODINIT_FUNC PyInit__cutils(void) {
-    return PyModule_Create(&cutilsmodule);
+    PyObject *module = PyModule_Create(&cutilsmodule);
+    if (!module) {
+        return NULL;
+    }
+    
+    if (PyModule_AddType(module, &AesGcmCipherType) < 0) {
+        Py_DECREF(module);
+        return NULL;
+    }
+    
+    return module;
 }
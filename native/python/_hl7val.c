@@ -1,5 +1,6 @@
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
+#include <limits.h>
 #include "libhl7val.h"
 
 static PyObject* py_validate_segment(PyObject* self, PyObject* args) {
@@ -12,8 +13,9 @@ static PyObject* py_validate_segment(PyObject* self, PyObject* args) {
     
     char error_msg[256] = {0};
     
+    int result;
     Py_BEGIN_ALLOW_THREADS
-    int result = hl7val_validate_segment(segment, segment_len, error_msg);
+    result = hl7val_validate_segment(segment, segment_len, error_msg);
     Py_END_ALLOW_THREADS
     
     if (result != HL7VAL_SUCCESS) {
@@ -43,9 +45,74 @@ static PyObject* py_extract_field(PyObject* self, PyObject* args) {
     return PyUnicode_FromString(output);
 }
 
+static PyObject* py_extract_fields(PyObject* self, PyObject* args) {
+    const char *segment;
+    PyObject *field_nums;
+    
+    if (!PyArg_ParseTuple(args, "sO", &segment, &field_nums)) {
+        return NULL;
+    }
+    
+    PyObject *seq = PySequence_Fast(field_nums, "field numbers must be a sequence");
+    if (!seq) {
+        return NULL;
+    }
+    
+    /* Index the segment once, then answer every field number from the index */
+    size_t offsets[HL7VAL_MAX_FIELDS];
+    size_t lengths[HL7VAL_MAX_FIELDS];
+    int field_count = hl7val_index_fields(segment, offsets, lengths, HL7VAL_MAX_FIELDS);
+    
+    Py_ssize_t n = PySequence_Fast_GET_SIZE(seq);
+    PyObject *fields = PyList_New(n);
+    if (!fields) {
+        Py_DECREF(seq);
+        return NULL;
+    }
+    
+    for (Py_ssize_t i = 0; i < n; i++) {
+        long field_num = PyLong_AsLong(PySequence_Fast_GET_ITEM(seq, i));
+        if (field_num == -1 && PyErr_Occurred()) {
+            goto error;
+        }
+        
+        PyObject *value;
+        if (field_num >= 1 && field_num <= field_count) {
+            value = PyUnicode_DecodeUTF8(segment + offsets[field_num - 1], lengths[field_num - 1], "strict");
+        } else if (field_count == HL7VAL_MAX_FIELDS && field_num > field_count && field_num <= INT_MAX) {
+            /* Past the end of the index; fall back to a single-field scan */
+            char output[256];
+            int result = hl7val_extract_field(segment, (int)field_num, output, sizeof(output));
+            if (result != HL7VAL_SUCCESS) {
+                PyErr_SetString(PyExc_ValueError, hl7val_error_string(result));
+                goto error;
+            }
+            value = PyUnicode_FromString(output);
+        } else {
+            int result = field_num < 1 ? HL7VAL_ERR_INVALID_FMT : HL7VAL_ERR_FIELD_COUNT;
+            PyErr_SetString(PyExc_ValueError, hl7val_error_string(result));
+            goto error;
+        }
+        
+        if (!value) {
+            goto error;
+        }
+        PyList_SET_ITEM(fields, i, value);
+    }
+    
+    Py_DECREF(seq);
+    return fields;
+    
+error:
+    Py_DECREF(fields);
+    Py_DECREF(seq);
+    return NULL;
+}
+
 static PyMethodDef HL7ValMethods[] = {
     {"validate_segment", py_validate_segment, METH_VARARGS, "Validate HL7 v2 segment"},
     {"extract_field", py_extract_field, METH_VARARGS, "Extract field from HL7 segment"},
+    {"extract_fields", py_extract_fields, METH_VARARGS, "Extract several fields from HL7 segment"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -1,15 +1,54 @@
 from setuptools import setup, Extension  # type: ignore[import-not-found]
+import hashlib
 import os
+import shutil
 import subprocess
+import sys
 
 # Build C libraries first
 native_dir = os.path.dirname(os.path.abspath(__file__))
 build_dir = os.path.join(native_dir, 'build')
 
-if not os.path.exists(build_dir):
-    os.makedirs(build_dir)
-    subprocess.check_call(['cmake', '..'], cwd=build_dir)
+# Use ccache for the cmake build and the extension compiles when it is installed
+ccache = shutil.which('ccache')
+
+
+def source_hash():
+    """Hash the C library sources, headers, build files and interpreter version."""
+    h = hashlib.sha256(sys.version.encode())
+    paths = [os.path.join(native_dir, 'CMakeLists.txt')]
+    for subdir in ('src', 'include', 'tests'):
+        for root, _, files in os.walk(os.path.join(native_dir, subdir)):
+            paths.extend(os.path.join(root, name) for name in files)
+    for path in sorted(paths):
+        h.update(os.path.relpath(path, native_dir).encode())
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+# Rerun cmake/make only when the sources changed since the last build
+stamp_path = os.path.join(build_dir, '.source-hash')
+current_hash = source_hash()
+try:
+    with open(stamp_path) as f:
+        built_hash = f.read().strip()
+except OSError:
+    built_hash = None
+
+if built_hash != current_hash:
+    os.makedirs(build_dir, exist_ok=True)
+    cmake_args = ['cmake', '..']
+    if ccache:
+        cmake_args.append('-DCMAKE_C_COMPILER_LAUNCHER=' + ccache)
+    subprocess.check_call(cmake_args, cwd=build_dir)
     subprocess.check_call(['make'], cwd=build_dir)
+    with open(stamp_path, 'w') as f:
+        f.write(current_hash)
+
+# Set after the cmake step, which would read a two-word CC as compiler + flags
+if ccache:
+    os.environ.setdefault('CC', 'ccache gcc')
 
 # Python extensions
 # Note: Only _cutils and _hl7val are implemented for now
@@ -20,7 +59,7 @@ extensions = [
         sources=['python/_cutils.c'],
         include_dirs=['include', '/usr/include'],
         library_dirs=['build'],
-        libraries=['cutils', 'ssl', 'crypto'],
+        libraries=['cutils', 'crypto'],
         extra_compile_args=['-O3', '-fPIC'],
     ),
     Extension(
@@ -2,9 +2,16 @@
 #include <openssl/evp.h>
 #include <openssl/rand.h>
 #include <openssl/err.h>
+#include <limits.h>
+#include <pthread.h>
 #include <string.h>
 #include <stdio.h>
 
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define CUTILS_HAVE_X86 1
+#endif
+
 /* Simple XXH3 implementation (simplified for demonstration) */
 static uint64_t xxh3_simple(const uint8_t *data, size_t len) {
     uint64_t hash = 0x9E3779B97F4A7C15ULL;
@@ -15,6 +22,102 @@ static uint64_t xxh3_simple(const uint8_t *data, size_t len) {
     return hash;
 }
 
+/*
+ * AES-256-GCM and SHA-256 are fetched from the provider once, and each thread
+ * keeps one cipher and one digest context that are re-initialized per call
+ * instead of allocated and freed.
+ */
+typedef struct {
+    EVP_CIPHER_CTX *gcm;
+    EVP_MD_CTX *md;
+} evp_thread_state;
+
+static pthread_once_t evp_once = PTHREAD_ONCE_INIT;
+static pthread_key_t evp_state_key;
+static EVP_CIPHER *gcm_cipher = NULL;
+static EVP_MD *sha256_md = NULL;
+
+static void evp_state_free(void *ptr) {
+    evp_thread_state *state = ptr;
+    EVP_CIPHER_CTX_free(state->gcm);
+    EVP_MD_CTX_free(state->md);
+    OPENSSL_free(state);
+}
+
+static void evp_init_once(void) {
+    if (pthread_key_create(&evp_state_key, evp_state_free) == 0) {
+        gcm_cipher = EVP_CIPHER_fetch(NULL, "AES-256-GCM", NULL);
+        sha256_md = EVP_MD_fetch(NULL, "SHA256", NULL);
+    }
+}
+
+static evp_thread_state *evp_thread_get(void) {
+    pthread_once(&evp_once, evp_init_once);
+    if (!gcm_cipher || !sha256_md) {
+        return NULL;
+    }
+
+    evp_thread_state *state = pthread_getspecific(evp_state_key);
+    if (!state) {
+        state = OPENSSL_zalloc(sizeof(*state));
+        if (!state) {
+            return NULL;
+        }
+        if (pthread_setspecific(evp_state_key, state) != 0) {
+            OPENSSL_free(state);
+            return NULL;
+        }
+    }
+    return state;
+}
+
+/* Return this thread's cipher context, initialized with key and iv for enc (1) or dec (0) */
+static EVP_CIPHER_CTX *gcm_thread_ctx(const uint8_t *key, const uint8_t *iv, int enc) {
+    evp_thread_state *state = evp_thread_get();
+    if (!state) {
+        return NULL;
+    }
+
+    /* Bind the cipher on first use; later calls only re-key the existing provider context */
+    if (!state->gcm) {
+        EVP_CIPHER_CTX *ctx = EVP_CIPHER_CTX_new();
+        if (!ctx) {
+            return NULL;
+        }
+        if (EVP_CipherInit_ex2(ctx, gcm_cipher, NULL, NULL, enc, NULL) != 1 ||
+            EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_IVLEN, CUTILS_AES_IV_SIZE, NULL) != 1) {
+            EVP_CIPHER_CTX_free(ctx);
+            return NULL;
+        }
+        state->gcm = ctx;
+    }
+
+    if (EVP_CipherInit_ex2(state->gcm, NULL, key, iv, enc, NULL) != 1) {
+        return NULL;
+    }
+    return state->gcm;
+}
+
+/* Return this thread's digest context, initialized for SHA-256 */
+static EVP_MD_CTX *sha256_thread_ctx(void) {
+    evp_thread_state *state = evp_thread_get();
+    if (!state) {
+        return NULL;
+    }
+
+    if (!state->md) {
+        state->md = EVP_MD_CTX_new();
+        if (!state->md) {
+            return NULL;
+        }
+    }
+
+    if (EVP_DigestInit_ex2(state->md, sha256_md, NULL) != 1) {
+        return NULL;
+    }
+    return state->md;
+}
+
 const char* cutils_error_string(int error_code) {
     switch (error_code) {
         case CUTILS_SUCCESS:
@@ -32,82 +135,92 @@ const char* cutils_error_string(int error_code) {
     }
 }
 
-int cutils_aes_gcm_encrypt(
-    const uint8_t *plaintext,
-    size_t plaintext_len,
-    const uint8_t *key,
-    uint8_t *output,
-    size_t *output_len
-) {
-    if (!plaintext || !key || !output || !output_len) {
-        return CUTILS_ERR_NULL_INPUT;
-    }
-
-    if (*output_len < plaintext_len + CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE) {
-        return CUTILS_ERR_BUFFER_SIZE;
-    }
-
-    EVP_CIPHER_CTX *ctx = NULL;
+/* Encrypt into output[IV_SIZE..]; ctx is already keyed and set to the IV in output[0..IV_SIZE) */
+static int gcm_seal(EVP_CIPHER_CTX *ctx, const uint8_t *plaintext, size_t plaintext_len,
+                    uint8_t *output, size_t *output_len) {
     int len = 0;
     int ciphertext_len = 0;
-    int ret = CUTILS_ERR_CRYPTO;
-
-    /* Generate random IV */
-    uint8_t iv[CUTILS_AES_IV_SIZE];
-    if (RAND_bytes(iv, CUTILS_AES_IV_SIZE) != 1) {
-        goto cleanup;
-    }
-
-    /* Copy IV to output */
-    memcpy(output, iv, CUTILS_AES_IV_SIZE);
-
-    /* Create and initialize context */
-    ctx = EVP_CIPHER_CTX_new();
-    if (!ctx) {
-        goto cleanup;
-    }
-
-    /* Initialize encryption */
-    if (EVP_EncryptInit_ex(ctx, EVP_aes_256_gcm(), NULL, NULL, NULL) != 1) {
-        goto cleanup;
-    }
-
-    /* Set IV length */
-    if (EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_IVLEN, CUTILS_AES_IV_SIZE, NULL) != 1) {
-        goto cleanup;
-    }
-
-    /* Initialize key and IV */
-    if (EVP_EncryptInit_ex(ctx, NULL, NULL, key, iv) != 1) {
-        goto cleanup;
-    }
 
     /* Encrypt plaintext */
     if (EVP_EncryptUpdate(ctx, output + CUTILS_AES_IV_SIZE, &len, plaintext, plaintext_len) != 1) {
-        goto cleanup;
+        return CUTILS_ERR_CRYPTO;
     }
     ciphertext_len = len;
 
     /* Finalize encryption */
     if (EVP_EncryptFinal_ex(ctx, output + CUTILS_AES_IV_SIZE + len, &len) != 1) {
-        goto cleanup;
+        return CUTILS_ERR_CRYPTO;
     }
     ciphertext_len += len;
 
     /* Get authentication tag */
     if (EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_GET_TAG, CUTILS_AES_TAG_SIZE,
                             output + CUTILS_AES_IV_SIZE + ciphertext_len) != 1) {
-        goto cleanup;
+        return CUTILS_ERR_CRYPTO;
     }
 
     *output_len = CUTILS_AES_IV_SIZE + ciphertext_len + CUTILS_AES_TAG_SIZE;
-    ret = CUTILS_SUCCESS;
+    return CUTILS_SUCCESS;
+}
+
+/* Decrypt and verify IV || ciphertext || tag; ctx is already keyed and set to that IV */
+static int gcm_open(EVP_CIPHER_CTX *ctx, const uint8_t *ciphertext, size_t ciphertext_len,
+                    uint8_t *output, size_t *output_len) {
+    int len = 0;
+    int plaintext_len = 0;
+
+    const uint8_t *ct = ciphertext + CUTILS_AES_IV_SIZE;
+    size_t ct_len = ciphertext_len - CUTILS_AES_IV_SIZE - CUTILS_AES_TAG_SIZE;
+    const uint8_t *tag = ct + ct_len;
+
+    /* Decrypt ciphertext */
+    if (EVP_DecryptUpdate(ctx, output, &len, ct, ct_len) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+    plaintext_len = len;
+
+    /* Set expected tag */
+    if (EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_TAG, CUTILS_AES_TAG_SIZE, (void*)tag) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    /* Finalize decryption (verifies tag) */
+    if (EVP_DecryptFinal_ex(ctx, output + len, &len) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+    plaintext_len += len;
+
+    *output_len = plaintext_len;
+    return CUTILS_SUCCESS;
+}
+
+int cutils_aes_gcm_encrypt(
+    const uint8_t *plaintext,
+    size_t plaintext_len,
+    const uint8_t *key,
+    uint8_t *output,
+    size_t *output_len
+) {
+    if (!plaintext || !key || !output || !output_len) {
+        return CUTILS_ERR_NULL_INPUT;
+    }
 
-cleanup:
-    if (ctx) {
-        EVP_CIPHER_CTX_free(ctx);
+    if (*output_len < plaintext_len + CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE) {
+        return CUTILS_ERR_BUFFER_SIZE;
     }
-    return ret;
+
+    /* Generate random IV and copy it to output */
+    if (RAND_bytes(output, CUTILS_AES_IV_SIZE) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    /* Initialize this thread's context with key and IV */
+    EVP_CIPHER_CTX *ctx = gcm_thread_ctx(key, output, 1);
+    if (!ctx) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    return gcm_seal(ctx, plaintext, plaintext_len, output, output_len);
 }
 
 int cutils_aes_gcm_decrypt(
@@ -125,67 +238,105 @@ int cutils_aes_gcm_decrypt(
         return CUTILS_ERR_INVALID_SIZE;
     }
 
-    EVP_CIPHER_CTX *ctx = NULL;
-    int len = 0;
-    int plaintext_len = 0;
-    int ret = CUTILS_ERR_CRYPTO;
-
-    /* Extract IV */
-    const uint8_t *iv = ciphertext;
-    const uint8_t *ct = ciphertext + CUTILS_AES_IV_SIZE;
-    size_t ct_len = ciphertext_len - CUTILS_AES_IV_SIZE - CUTILS_AES_TAG_SIZE;
-    const uint8_t *tag = ct + ct_len;
-
-    if (*output_len < ct_len) {
+    if (*output_len < ciphertext_len - CUTILS_AES_IV_SIZE - CUTILS_AES_TAG_SIZE) {
         return CUTILS_ERR_BUFFER_SIZE;
     }
 
-    /* Create and initialize context */
-    ctx = EVP_CIPHER_CTX_new();
+    /* Initialize this thread's context with key and the leading IV */
+    EVP_CIPHER_CTX *ctx = gcm_thread_ctx(key, ciphertext, 0);
     if (!ctx) {
-        goto cleanup;
+        return CUTILS_ERR_CRYPTO;
     }
 
-    /* Initialize decryption */
-    if (EVP_DecryptInit_ex(ctx, EVP_aes_256_gcm(), NULL, NULL, NULL) != 1) {
-        goto cleanup;
+    return gcm_open(ctx, ciphertext, ciphertext_len, output, output_len);
+}
+
+struct cutils_aes_gcm_ctx {
+    EVP_CIPHER_CTX *ctx;
+};
+
+cutils_aes_gcm_ctx *cutils_aes_gcm_ctx_new(const uint8_t *key) {
+    if (!key) {
+        return NULL;
     }
 
-    /* Set IV length */
-    if (EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_IVLEN, CUTILS_AES_IV_SIZE, NULL) != 1) {
-        goto cleanup;
+    pthread_once(&evp_once, evp_init_once);
+    if (!gcm_cipher) {
+        return NULL;
     }
 
-    /* Initialize key and IV */
-    if (EVP_DecryptInit_ex(ctx, NULL, NULL, key, iv) != 1) {
-        goto cleanup;
+    cutils_aes_gcm_ctx *gcm = OPENSSL_zalloc(sizeof(*gcm));
+    if (!gcm) {
+        return NULL;
     }
 
-    /* Decrypt ciphertext */
-    if (EVP_DecryptUpdate(ctx, output, &len, ct, ct_len) != 1) {
-        goto cleanup;
+    /* Expand the key schedule once; each call afterwards only sets a new IV */
+    gcm->ctx = EVP_CIPHER_CTX_new();
+    if (!gcm->ctx ||
+        EVP_CipherInit_ex2(gcm->ctx, gcm_cipher, NULL, NULL, 1, NULL) != 1 ||
+        EVP_CIPHER_CTX_ctrl(gcm->ctx, EVP_CTRL_GCM_SET_IVLEN, CUTILS_AES_IV_SIZE, NULL) != 1 ||
+        EVP_CipherInit_ex2(gcm->ctx, NULL, key, NULL, 1, NULL) != 1) {
+        cutils_aes_gcm_ctx_free(gcm);
+        return NULL;
     }
-    plaintext_len = len;
 
-    /* Set expected tag */
-    if (EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_TAG, CUTILS_AES_TAG_SIZE, (void*)tag) != 1) {
-        goto cleanup;
+    return gcm;
+}
+
+void cutils_aes_gcm_ctx_free(cutils_aes_gcm_ctx *gcm) {
+    if (gcm) {
+        EVP_CIPHER_CTX_free(gcm->ctx);
+        OPENSSL_clear_free(gcm, sizeof(*gcm));
     }
+}
 
-    /* Finalize decryption (verifies tag) */
-    if (EVP_DecryptFinal_ex(ctx, output + len, &len) != 1) {
-        goto cleanup;
+int cutils_aes_gcm_ctx_encrypt(
+    cutils_aes_gcm_ctx *gcm,
+    const uint8_t *plaintext,
+    size_t plaintext_len,
+    uint8_t *output,
+    size_t *output_len
+) {
+    if (!gcm || !plaintext || !output || !output_len) {
+        return CUTILS_ERR_NULL_INPUT;
     }
-    plaintext_len += len;
 
-    *output_len = plaintext_len;
-    ret = CUTILS_SUCCESS;
+    if (*output_len < plaintext_len + CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE) {
+        return CUTILS_ERR_BUFFER_SIZE;
+    }
+
+    if (RAND_bytes(output, CUTILS_AES_IV_SIZE) != 1 ||
+        EVP_CipherInit_ex2(gcm->ctx, NULL, NULL, output, 1, NULL) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    return gcm_seal(gcm->ctx, plaintext, plaintext_len, output, output_len);
+}
+
+int cutils_aes_gcm_ctx_decrypt(
+    cutils_aes_gcm_ctx *gcm,
+    const uint8_t *ciphertext,
+    size_t ciphertext_len,
+    uint8_t *output,
+    size_t *output_len
+) {
+    if (!gcm || !ciphertext || !output || !output_len) {
+        return CUTILS_ERR_NULL_INPUT;
+    }
 
-cleanup:
-    if (ctx) {
-        EVP_CIPHER_CTX_free(ctx);
+    if (ciphertext_len < CUTILS_AES_IV_SIZE + CUTILS_AES_TAG_SIZE) {
+        return CUTILS_ERR_INVALID_SIZE;
+    }
+
+    if (*output_len < ciphertext_len - CUTILS_AES_IV_SIZE - CUTILS_AES_TAG_SIZE) {
+        return CUTILS_ERR_BUFFER_SIZE;
     }
-    return ret;
+
+    if (EVP_CipherInit_ex2(gcm->ctx, NULL, NULL, ciphertext, 0, NULL) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    return gcm_open(gcm->ctx, ciphertext, ciphertext_len, output, output_len);
 }
 
 int cutils_sha256(const uint8_t *data, size_t data_len, uint8_t *output) {
@@ -193,22 +344,18 @@ int cutils_sha256(const uint8_t *data, size_t data_len, uint8_t *output) {
         return CUTILS_ERR_NULL_INPUT;
     }
 
-    EVP_MD_CTX *ctx = EVP_MD_CTX_new();
+    EVP_MD_CTX *ctx = sha256_thread_ctx();
     if (!ctx) {
         return CUTILS_ERR_CRYPTO;
     }
 
-    int ret = CUTILS_ERR_CRYPTO;
-    if (EVP_DigestInit_ex(ctx, EVP_sha256(), NULL) == 1 &&
-        EVP_DigestUpdate(ctx, data, data_len) == 1) {
-        unsigned int out_len = 0;
-        if (EVP_DigestFinal_ex(ctx, output, &out_len) == 1 && out_len == 32) {
-            ret = CUTILS_SUCCESS;
-        }
+    unsigned int out_len = 0;
+    if (EVP_DigestUpdate(ctx, data, data_len) != 1 ||
+        EVP_DigestFinal_ex(ctx, output, &out_len) != 1 || out_len != CUTILS_SHA256_SIZE) {
+        return CUTILS_ERR_CRYPTO;
     }
 
-    EVP_MD_CTX_free(ctx);
-    return ret;
+    return CUTILS_SUCCESS;
 }
 
 uint64_t cutils_xxh3(const uint8_t *data, size_t data_len) {
@@ -230,16 +377,109 @@ int cutils_generate_token(uint8_t *output) {
     return CUTILS_SUCCESS;
 }
 
-int cutils_hex_encode(const uint8_t *data, size_t data_len, char *output) {
-    if (!data || !output) {
+int cutils_generate_tokens(uint8_t *output, size_t count) {
+    if (!output) {
         return CUTILS_ERR_NULL_INPUT;
     }
 
-    const char hex_chars[] = "0123456789abcdef";
+    /* RAND_bytes takes an int length */
+    if (count > INT_MAX / CUTILS_TOKEN_SIZE) {
+        return CUTILS_ERR_INVALID_SIZE;
+    }
+
+    if (count > 0 && RAND_bytes(output, (int)(count * CUTILS_TOKEN_SIZE)) != 1) {
+        return CUTILS_ERR_CRYPTO;
+    }
+
+    return CUTILS_SUCCESS;
+}
+
+static const char hex_chars[] = "0123456789abcdef";
+
+static void hex_encode_scalar(const uint8_t *data, size_t data_len, char *output) {
     for (size_t i = 0; i < data_len; i++) {
         output[i * 2] = hex_chars[data[i] >> 4];
         output[i * 2 + 1] = hex_chars[data[i] & 0x0F];
     }
+}
+
+#ifdef CUTILS_HAVE_X86
+/* 16 bytes -> 32 hex chars per iteration, using PSHUFB as a nibble lookup */
+__attribute__((target("ssse3")))
+static void hex_encode_ssse3(const uint8_t *data, size_t data_len, char *output) {
+    const __m128i lut = _mm_loadu_si128((const __m128i *)hex_chars);
+    const __m128i mask = _mm_set1_epi8(0x0F);
+    size_t i = 0;
+
+    for (; i + 16 <= data_len; i += 16) {
+        __m128i in = _mm_loadu_si128((const __m128i *)(data + i));
+        __m128i hi = _mm_shuffle_epi8(lut, _mm_and_si128(_mm_srli_epi16(in, 4), mask));
+        __m128i lo = _mm_shuffle_epi8(lut, _mm_and_si128(in, mask));
+        _mm_storeu_si128((__m128i *)(output + i * 2), _mm_unpacklo_epi8(hi, lo));
+        _mm_storeu_si128((__m128i *)(output + i * 2 + 16), _mm_unpackhi_epi8(hi, lo));
+    }
+
+    hex_encode_scalar(data + i, data_len - i, output + i * 2);
+}
+
+/* 32 bytes -> 64 hex chars per iteration; the unpacks work per 128-bit lane, so lanes are re-paired on store */
+__attribute__((target("avx2")))
+static void hex_encode_avx2(const uint8_t *data, size_t data_len, char *output) {
+    const __m256i lut = _mm256_broadcastsi128_si256(_mm_loadu_si128((const __m128i *)hex_chars));
+    const __m256i mask = _mm256_set1_epi8(0x0F);
+    size_t i = 0;
+
+    for (; i + 32 <= data_len; i += 32) {
+        __m256i in = _mm256_loadu_si256((const __m256i *)(data + i));
+        __m256i hi = _mm256_shuffle_epi8(lut, _mm256_and_si256(_mm256_srli_epi16(in, 4), mask));
+        __m256i lo = _mm256_shuffle_epi8(lut, _mm256_and_si256(in, mask));
+        __m256i a = _mm256_unpacklo_epi8(hi, lo);  /* bytes 0-7 | 16-23 */
+        __m256i b = _mm256_unpackhi_epi8(hi, lo);  /* bytes 8-15 | 24-31 */
+        _mm256_storeu_si256((__m256i *)(output + i * 2), _mm256_permute2x128_si256(a, b, 0x20));
+        _mm256_storeu_si256((__m256i *)(output + i * 2 + 32), _mm256_permute2x128_si256(a, b, 0x31));
+    }
+
+    hex_encode_ssse3(data + i, data_len - i, output + i * 2);
+}
+#endif
+
+/*
+ * CPU dispatch table for the SIMD kernels, resolved once per process to the
+ * widest variant the CPU supports. AES-GCM and SHA-256 are not listed here:
+ * OpenSSL already picks its AES-NI/VAES and SHA-NI code paths at runtime.
+ */
+typedef struct {
+    void (*hex_encode)(const uint8_t *data, size_t data_len, char *output);
+} cutils_dispatch_table;
+
+static pthread_once_t dispatch_once = PTHREAD_ONCE_INIT;
+static cutils_dispatch_table dispatch = {
+    .hex_encode = hex_encode_scalar,
+};
+
+static void dispatch_init(void) {
+#ifdef CUTILS_HAVE_X86
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx2")) {
+        dispatch.hex_encode = hex_encode_avx2;
+    } else if (__builtin_cpu_supports("ssse3")) {
+        dispatch.hex_encode = hex_encode_ssse3;
+    }
+#endif
+}
+
+int cutils_hex_encode(const uint8_t *data, size_t data_len, char *output) {
+    if (!data || !output) {
+        return CUTILS_ERR_NULL_INPUT;
+    }
+
+    /* Inputs shorter than one vector go straight to the scalar loop */
+    if (data_len >= 16) {
+        pthread_once(&dispatch_once, dispatch_init);
+        dispatch.hex_encode(data, data_len, output);
+    } else {
+        hex_encode_scalar(data, data_len, output);
+    }
     output[data_len * 2] = '\0';
 
     return CUTILS_SUCCESS;
@@ -1,4 +1,5 @@
 #include "libhl7val.h"
+#include <stdint.h>
 #include <string.h>
 #include <ctype.h>
 #include <stdio.h>
@@ -67,12 +68,19 @@ int hl7val_validate_segment(const char *segment, size_t segment_len, char *error
         return HL7VAL_ERR_INVALID_FMT;
     }
 
-    /* Count fields */
+    /*
+     * Count fields. Matches are summed into a byte-wide counter over blocks of
+     * at most 255 bytes, so the compiler can vectorize the compare without
+     * widening every lane to int.
+     */
     int field_count = 1;
-    for (size_t i = 3; i < segment_len; i++) {
-        if (segment[i] == delimiter) {
-            field_count++;
+    for (size_t i = 3; i < segment_len;) {
+        size_t block_end = i + 255 < segment_len ? i + 255 : segment_len;
+        uint8_t matches = 0;
+        for (; i < block_end; i++) {
+            matches += (segment[i] == delimiter);
         }
+        field_count += matches;
     }
 
     /* For MSH segment, the field separator itself is MSH-1, so add 1 */
@@ -128,24 +136,18 @@ int hl7val_extract_field(const char *segment, int field_num, char *output, size_
     int current_field = 1;
     const char *field_start = ptr;
 
-    /* Find the requested field */
-    while (*ptr != '\0' && current_field < field_num) {
-        if (*ptr == '|') {
-            current_field++;
-            field_start = ptr + 1;
+    /* Find the requested field, jumping from delimiter to delimiter */
+    while (current_field < field_num) {
+        ptr = strchr(ptr, '|');
+        if (!ptr) {
+            return HL7VAL_ERR_FIELD_COUNT;
         }
-        ptr++;
-    }
-
-    if (current_field != field_num) {
-        return HL7VAL_ERR_FIELD_COUNT;
+        current_field++;
+        field_start = ++ptr;
     }
 
     /* Find end of field */
-    const char *field_end = field_start;
-    while (*field_end != '\0' && *field_end != '|') {
-        field_end++;
-    }
+    const char *field_end = field_start + strcspn(field_start, "|");
 
     /* Copy field value */
     size_t field_len = field_end - field_start;
@@ -158,3 +160,29 @@ int hl7val_extract_field(const char *segment, int field_num, char *output, size_
 
     return HL7VAL_SUCCESS;
 }
+
+int hl7val_index_fields(const char *segment, size_t *offsets, size_t *lengths, int max_fields) {
+    if (!segment || !offsets || !lengths) {
+        return HL7VAL_ERR_NULL_INPUT;
+    }
+
+    /* Fields start after the segment ID and delimiter */
+    if (memchr(segment, '\0', 4)) {
+        return 0;
+    }
+
+    const char *field_start = segment + 4;
+    int count = 0;
+    while (count < max_fields) {
+        size_t field_len = strcspn(field_start, "|");
+        offsets[count] = field_start - segment;
+        lengths[count] = field_len;
+        count++;
+        if (field_start[field_len] == '\0') {
+            break;
+        }
+        field_start += field_len + 1;
+    }
+
+    return count;
+}
@@ -33,6 +33,77 @@ void test_aes_gcm_encryption() {
     printf("✓ test_aes_gcm_encryption passed\n");
 }
 
+void test_aes_gcm_context_reuse() {
+    uint8_t key1[CUTILS_AES_KEY_SIZE];
+    uint8_t key2[CUTILS_AES_KEY_SIZE];
+    const char *plaintext = "OBX|1|NM|GLU||105|mg/dL";
+    uint8_t ct1[256], ct2[256], out[256];
+    size_t ct1_len = sizeof(ct1), ct2_len = sizeof(ct2), out_len;
+
+    assert(cutils_generate_token(key1) == CUTILS_SUCCESS);
+    assert(cutils_generate_token(key2) == CUTILS_SUCCESS);
+    assert(cutils_aes_gcm_encrypt((uint8_t*)plaintext, strlen(plaintext), key1, ct1, &ct1_len) == CUTILS_SUCCESS);
+    assert(cutils_aes_gcm_encrypt((uint8_t*)plaintext, strlen(plaintext), key2, ct2, &ct2_len) == CUTILS_SUCCESS);
+
+    /* A tampered tag fails without poisoning the next call */
+    ct1[ct1_len - 1] ^= 0x01;
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_decrypt(ct1, ct1_len, key1, out, &out_len) == CUTILS_ERR_CRYPTO);
+    ct1[ct1_len - 1] ^= 0x01;
+
+    /* Wrong key is rejected, then both keys decrypt their own ciphertext */
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_decrypt(ct1, ct1_len, key2, out, &out_len) == CUTILS_ERR_CRYPTO);
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_decrypt(ct2, ct2_len, key2, out, &out_len) == CUTILS_SUCCESS);
+    assert(out_len == strlen(plaintext) && memcmp(out, plaintext, out_len) == 0);
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_decrypt(ct1, ct1_len, key1, out, &out_len) == CUTILS_SUCCESS);
+    assert(out_len == strlen(plaintext) && memcmp(out, plaintext, out_len) == 0);
+
+    printf("✓ test_aes_gcm_context_reuse passed\n");
+}
+
+void test_aes_gcm_keyed_context() {
+    uint8_t key[CUTILS_AES_KEY_SIZE];
+    const char *plaintext = "PID|1|MRN0001|DOE^JANE";
+    uint8_t ct1[256], ct2[256], out[256];
+    size_t ct1_len = sizeof(ct1), ct2_len = sizeof(ct2), out_len;
+
+    assert(cutils_generate_token(key) == CUTILS_SUCCESS);
+    cutils_aes_gcm_ctx *gcm = cutils_aes_gcm_ctx_new(key);
+    assert(gcm != NULL);
+
+    /* Fresh IV per message, and interchangeable with the one-shot functions */
+    assert(cutils_aes_gcm_ctx_encrypt(gcm, (uint8_t*)plaintext, strlen(plaintext), ct1, &ct1_len) == CUTILS_SUCCESS);
+    assert(cutils_aes_gcm_ctx_encrypt(gcm, (uint8_t*)plaintext, strlen(plaintext), ct2, &ct2_len) == CUTILS_SUCCESS);
+    assert(ct1_len == ct2_len && memcmp(ct1, ct2, CUTILS_AES_IV_SIZE) != 0);
+
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_decrypt(ct1, ct1_len, key, out, &out_len) == CUTILS_SUCCESS);
+    assert(out_len == strlen(plaintext) && memcmp(out, plaintext, out_len) == 0);
+
+    out_len = sizeof(ct2);
+    assert(cutils_aes_gcm_encrypt((uint8_t*)plaintext, strlen(plaintext), key, ct2, &out_len) == CUTILS_SUCCESS);
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_ctx_decrypt(gcm, ct2, ct2_len, out, &out_len) == CUTILS_SUCCESS);
+    assert(out_len == strlen(plaintext) && memcmp(out, plaintext, out_len) == 0);
+
+    /* Tampering is detected, and the context keeps working afterwards */
+    ct1[CUTILS_AES_IV_SIZE] ^= 0x01;
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_ctx_decrypt(gcm, ct1, ct1_len, out, &out_len) == CUTILS_ERR_CRYPTO);
+    ct1[CUTILS_AES_IV_SIZE] ^= 0x01;
+    out_len = sizeof(out);
+    assert(cutils_aes_gcm_ctx_decrypt(gcm, ct1, ct1_len, out, &out_len) == CUTILS_SUCCESS);
+
+    assert(cutils_aes_gcm_ctx_new(NULL) == NULL);
+    cutils_aes_gcm_ctx_free(gcm);
+    cutils_aes_gcm_ctx_free(NULL);
+
+    printf("✓ test_aes_gcm_keyed_context passed\n");
+}
+
 void test_sha256() {
     const char *data = "test data";
     uint8_t hash[CUTILS_SHA256_SIZE];
@@ -43,6 +114,14 @@ void test_sha256() {
     uint8_t hash2[CUTILS_SHA256_SIZE];
     assert(cutils_sha256((uint8_t*)data, strlen(data), hash2) == CUTILS_SUCCESS);
     assert(memcmp(hash, hash2, CUTILS_SHA256_SIZE) == 0);
+
+    /* FIPS 180-2 test vector, run twice to cover the reused digest context */
+    char hex[CUTILS_SHA256_SIZE * 2 + 1];
+    for (int i = 0; i < 2; i++) {
+        assert(cutils_sha256((uint8_t*)"abc", 3, hash) == CUTILS_SUCCESS);
+        assert(cutils_hex_encode(hash, CUTILS_SHA256_SIZE, hex) == CUTILS_SUCCESS);
+        assert(strcmp(hex, "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad") == 0);
+    }
     
     printf("✓ test_sha256 passed\n");
 }
@@ -61,6 +140,22 @@ void test_hex_encoding() {
     assert(decoded_len == sizeof(data));
     assert(memcmp(data, decoded, decoded_len) == 0);
     
+    /* Every length around the 16-byte vector width matches a reference encoding */
+    uint8_t bytes[70];
+    char long_hex[sizeof(bytes) * 2 + 1];
+    char expected[sizeof(bytes) * 2 + 1];
+    for (size_t i = 0; i < sizeof(bytes); i++) {
+        bytes[i] = (uint8_t)(i * 37 + 11);
+    }
+    for (size_t len = 0; len <= sizeof(bytes); len++) {
+        for (size_t i = 0; i < len; i++) {
+            snprintf(expected + i * 2, 3, "%02x", bytes[i]);
+        }
+        expected[len * 2] = '\0';
+        assert(cutils_hex_encode(bytes, len, long_hex) == CUTILS_SUCCESS);
+        assert(strcmp(long_hex, expected) == 0);
+    }
+    
     printf("✓ test_hex_encoding passed\n");
 }
 
@@ -74,6 +169,15 @@ void test_token_generation() {
     /* Tokens should be different (statistically) */
     assert(memcmp(token1, token2, CUTILS_TOKEN_SIZE) != 0);
     
+    /* A batch fills count * 32 bytes with distinct tokens */
+    uint8_t batch[4 * CUTILS_TOKEN_SIZE];
+    assert(cutils_generate_tokens(batch, 4) == CUTILS_SUCCESS);
+    for (int i = 1; i < 4; i++) {
+        assert(memcmp(batch, batch + i * CUTILS_TOKEN_SIZE, CUTILS_TOKEN_SIZE) != 0);
+    }
+    assert(cutils_generate_tokens(batch, 0) == CUTILS_SUCCESS);
+    assert(cutils_generate_tokens(NULL, 4) == CUTILS_ERR_NULL_INPUT);
+    
     printf("✓ test_token_generation passed\n");
 }
 
@@ -81,6 +185,8 @@ int main() {
     printf("Running crypto utils tests...\n");
     
     test_aes_gcm_encryption();
+    test_aes_gcm_context_reuse();
+    test_aes_gcm_keyed_context();
     test_sha256();
     test_hex_encoding();
     test_token_generation();
@@ -46,10 +46,76 @@ void test_field_extraction() {
     result = hl7val_extract_field(seg, 3, output, sizeof(output));
     assert(result == HL7VAL_SUCCESS);
     assert(strcmp(output, "JONES^JOHN^Q") == 0);
+
+    /* Empty field, last field, and one past the last field */
+    result = hl7val_extract_field(seg, 4, output, sizeof(output));
+    assert(result == HL7VAL_SUCCESS);
+    assert(strcmp(output, "") == 0);
+
+    result = hl7val_extract_field(seg, 6, output, sizeof(output));
+    assert(result == HL7VAL_SUCCESS);
+    assert(strcmp(output, "M") == 0);
+
+    result = hl7val_extract_field(seg, 7, output, sizeof(output));
+    assert(result == HL7VAL_ERR_FIELD_COUNT);
     
     printf("✓ test_field_extraction passed\n");
 }
 
+void test_field_count() {
+    char error[256];
+
+    /* OBX needs 5 fields; trailing empty fields still count */
+    const char *short_obx = "OBX|1|NM|GLU";
+    assert(hl7val_validate_segment(short_obx, strlen(short_obx), error) == HL7VAL_ERR_FIELD_COUNT);
+
+    const char *obx = "OBX|1|NM|GLU|";
+    assert(hl7val_validate_segment(obx, strlen(obx), error) == HL7VAL_SUCCESS);
+
+    /* Only the first segment_len bytes are counted */
+    assert(hl7val_validate_segment(obx, strlen(obx) - 1, error) == HL7VAL_ERR_FIELD_COUNT);
+
+    /* Counting spans several 255-byte blocks: 256 fields pass, 257 do not */
+    char wide[1024] = "ZZZ";
+    for (int i = 1; i < HL7VAL_MAX_FIELDS; i++) {
+        strcat(wide, "|x");
+    }
+    assert(hl7val_validate_segment(wide, strlen(wide), error) == HL7VAL_SUCCESS);
+    strcat(wide, "|");
+    assert(hl7val_validate_segment(wide, strlen(wide), error) == HL7VAL_ERR_FIELD_COUNT);
+
+    printf("✓ test_field_count passed\n");
+}
+
+void test_field_index() {
+    const char *seg = "PID|1|12345|JONES^JOHN^Q||19800101|M";
+    size_t offsets[HL7VAL_MAX_FIELDS];
+    size_t lengths[HL7VAL_MAX_FIELDS];
+    char output[128];
+
+    int count = hl7val_index_fields(seg, offsets, lengths, HL7VAL_MAX_FIELDS);
+    assert(count == 6);
+
+    /* Every indexed field matches the single-field extraction */
+    for (int i = 0; i < count; i++) {
+        assert(hl7val_extract_field(seg, i + 1, output, sizeof(output)) == HL7VAL_SUCCESS);
+        assert(strlen(output) == lengths[i]);
+        assert(strncmp(seg + offsets[i], output, lengths[i]) == 0);
+    }
+
+    /* Scanning stops at max_fields */
+    assert(hl7val_index_fields(seg, offsets, lengths, 2) == 2);
+    assert(lengths[1] == 5);
+
+    /* No fields before the delimiter; an empty first field after it */
+    assert(hl7val_index_fields("PID", offsets, lengths, HL7VAL_MAX_FIELDS) == 0);
+    assert(hl7val_index_fields("PID|", offsets, lengths, HL7VAL_MAX_FIELDS) == 1);
+    assert(lengths[0] == 0);
+    assert(hl7val_index_fields(NULL, offsets, lengths, HL7VAL_MAX_FIELDS) == HL7VAL_ERR_NULL_INPUT);
+
+    printf("✓ test_field_index passed\n");
+}
+
 int main() {
     printf("Running HL7 validation tests...\n");
     
@@ -58,6 +124,8 @@ int main() {
     test_too_short();
     test_null_input();
     test_field_extraction();
+    test_field_count();
+    test_field_index();
     
     printf("\nAll tests passed! ✓\n");
     return 0;